@@ -2,6 +2,54 @@ import pygame
 import math
 import random
 
+class BoltRenderer:
+    # Bolt geometry from a bank of pre-generated jitter templates. A template is a list
+    # of sideways offsets in -1..1, one per 10 px step; it is stretched along the bolt and
+    # rotated to its direction, so a bolt only costs a few multiplies per point. Each bolt
+    # keeps its template (and its point list while the endpoints stay put) until the next zap.
+    TEMPLATE_COUNT = 32
+    MAX_SEGMENTS = 96  # Longest bolt that gets a fresh offset every 10 px
+    SEGMENT_LENGTH = 10
+    JITTER = 15  # Largest sideways offset in pixels
+
+    def __init__(self, seed=None):
+        # Own random generator, so drawing never shifts the game's random sequence
+        self.rng = random.Random(seed)
+        self.templates = [[self.rng.uniform(-1, 1) for _ in range(self.MAX_SEGMENTS)]
+                          for _ in range(self.TEMPLATE_COUNT)]
+        self.bolts = {}  # key -> [template, start_pos, target_pos, points]
+
+    def clear(self): # New zap: every bolt picks a new template
+        self.bolts.clear()
+
+    def points(self, key, start_pos, target_pos):
+        bolt = self.bolts.get(key)
+        if bolt is not None:
+            if bolt[1] == start_pos and bolt[2] == target_pos:
+                return bolt[3]  # Nothing moved since the last frame
+            template = bolt[0]
+        else:
+            template = self.rng.choice(self.templates)
+
+        sx, sy = start_pos
+        dx = target_pos[0] - sx
+        dy = target_pos[1] - sy
+        dist = math.hypot(dx, dy)
+        segments = min(int(dist / self.SEGMENT_LENGTH), self.MAX_SEGMENTS)
+        points = [start_pos]
+        if segments > 0:
+            # Sideways unit vector scaled to the jitter size
+            px = -dy / dist * self.JITTER
+            py = dx / dist * self.JITTER
+            for i in range(segments):
+                t = (i + 1) / segments
+                j = template[i]
+                points.append((sx + dx * t + px * j, sy + dy * t + py * j))
+        points.append(target_pos)
+
+        self.bolts[key] = [template, start_pos, target_pos, points]
+        return points
+
 class LightningStaff:
     def __init__(self, x, y, size=40):
         # Position and basic properties
@@ -12,6 +60,9 @@ class LightningStaff:
         self.zap_timer = 0
         self.current_targets = []
         self.mini_staffs = []  # [x, y, time_remaining]
+        self.drawn_rects = []  # Screen areas touched by the last draw()
+        self.camera = (0, 0)  # World position of the screen at the last submit()
+        self.bolt_renderer = BoltRenderer()
 
         # Visual properties
         self.lightning_color = (0, 191, 255)
@@ -39,6 +90,7 @@ class LightningStaff:
         pygame.draw.circle(self.image, (0, 150, 255, 100), (self.size * 1.5, self.size * 1.5), self.glow_radius * 0.7)
         pygame.draw.circle(self.image, (100, 200, 255), (self.size * 1.5, self.size * 1.5), self.size // 2)
         self.rect = self.image.get_rect(center=(self.x, self.y))
+        self.mini_image = pygame.transform.scale(self.image, (int(self.size * 1.5), int(self.size * 1.5)))
 
     def get_upgrade_value(self, upgrade_type): 
         if upgrade_type in self.upgrades:
@@ -71,6 +123,11 @@ class LightningStaff:
     def mini_staff_duration(self):
         return self.get_upgrade_value('mini_duration')
 
+    def reach_rects(self): # World rects the staff and its mini-staffs can zap into
+        reach = int(self.current_chain_range()) + 1
+        return [pygame.Rect(x - reach, y - reach, 2 * reach, 2 * reach)
+                for x, y in [(self.x, self.y)] + [(mini[0], mini[1]) for mini in self.mini_staffs]]
+
     def upgrade(self, upgrade_type): # Upgrade the staff and check if it can be upgraded
         if upgrade_type in self.upgrades:
             upgrade = self.upgrades[upgrade_type]
@@ -95,15 +152,16 @@ class LightningStaff:
             if mini[2] <= 0:
                 self.mini_staffs.remove(mini)
 
-    def check_collision(self, enemies): # Check for enemy collisions
+    def check_collision(self, enemies, enemy_grid=None): # Check for enemy collisions
         if not self.active or self.zap_timer > 0:
             return []
 
         collided_enemies = []
         
-        targets = self.find_multiple_targets(enemies, (self.x, self.y))
+        targets = self.find_multiple_targets(enemies, (self.x, self.y), enemy_grid)
         self.current_targets = targets
         self.zap_timer = self.current_cooldown()
+        self.bolt_renderer.clear()
 
         for enemy in targets: # Check for each target 
             if enemy in enemies:
@@ -115,7 +173,7 @@ class LightningStaff:
         # Mini-staffs damage and targets
         mini_staff_targets = {}
         for mini in self.mini_staffs:
-            mini_targets = self.find_multiple_targets(enemies, (mini[0], mini[1])) 
+            mini_targets = self.find_multiple_targets(enemies, (mini[0], mini[1]), enemy_grid)
             mini_staff_targets[tuple(mini)] = mini_targets
             for enemy in mini_targets:
                 if enemy in enemies:
@@ -125,14 +183,17 @@ class LightningStaff:
         self.mini_staff_targets = mini_staff_targets
         return collided_enemies
 
-    def find_multiple_targets(self, enemies, start_pos): #  Find multiple targets in range
+    def find_multiple_targets(self, enemies, start_pos, enemy_grid=None): #  Find multiple targets in range
         if not enemies: # mainly for the very start as this caused a crash 
             return []
 
+        max_targets = self.current_chain_count()
+        range_limit = self.current_chain_range()
+        if enemy_grid is not None: # k nearest from the grid, only cells within range are visited
+            return enemy_grid.nearest(start_pos[0], start_pos[1], k=max_targets, max_dist=range_limit)
+
         targets = []
-        max_targets = self.get_upgrade_value('targets')
         available_enemies = enemies.copy()
-        range_limit = self.get_upgrade_value('range')
 
         while len(targets) < max_targets and available_enemies: #targets are less than the maximum targets and available enemies find and add enemies to the list
             nearest = None
@@ -152,35 +213,13 @@ class LightningStaff:
 
         return targets
 
-    def draw_lightning(self, surface, start_pos, target_pos, width_mult=1.0):
-        # Create list of points starting with the source position
-        points = [start_pos]
-        
-        # Calculate total distance between start and end points
-        dist = math.sqrt((target_pos[0] - start_pos[0]) ** 2 + (target_pos[1] - start_pos[1]) ** 2)
-        
-        # Divide the line into segments (1 segment per 10 pixels)
-        segments = int(dist / 10)
-
-        # Generate jagged lightning effect
-        for i in range(segments):
-            # Calculate position along the line (t goes from 0 to 1)
-            t = (i + 1) / segments
-            
-            # Get the position on straight line between start and end
-            mid_x = start_pos[0] + (target_pos[0] - start_pos[0]) * t
-            mid_y = start_pos[1] + (target_pos[1] - start_pos[1]) * t
-            
-            # Add random offset (-15 to +15 pixels) to create jagged effect
-            offset = random.randint(-15, 15)
-            points.append((mid_x + offset, mid_y + offset))
-        
-        # Add the final target position
-        points.append(target_pos)
+    def draw_lightning(self, surface, start_pos, target_pos, width_mult=1.0, key=None):
+        # Jagged line from the bolt renderer; key identifies the bolt across frames
+        points = self.bolt_renderer.points(key, start_pos, target_pos)
 
         # Draw 3 layers of lightning:
-        # 1. Wide dark blue background glow
-        pygame.draw.lines(surface, (0, 50, 255, 128), False, points, 
+        # 1. Wide dark blue background glow (its bounding box covers the whole bolt)
+        bolt_rect = pygame.draw.lines(surface, (0, 50, 255, 128), False, points, 
                          int(self.lightning_width * width_mult + 4))
         
         # 2. Medium bright blue main bolt
@@ -190,26 +229,41 @@ class LightningStaff:
         # 3. Thin white center for intensity
         pygame.draw.lines(surface, (200, 230, 255), False, points,
                          int(2 * width_mult))
-
-    def draw(self, surface):
-        # Draw main staff
-        surface.blit(self.image, self.rect)
-
-        # Draw mini-staffs and their lightning
-        mini_image = pygame.transform.scale(self.image, (int(self.size * 1.5), int(self.size * 1.5)))
+        return bolt_rect
+
+    def submit(self, queue, layer="weapons", offset=(0, 0), camera=(0, 0)):
+        # Queue staff sprites for batched drawing; bolts are lines, so they are drawn by a
+        # callback right after the layer's sprites. offset shifts the staff with the player
+        # (it already includes the camera); camera is the world position of the screen.
+        rect = self.rect.move(offset)
+        self.drawn_rects = [rect]
+        queue.add(layer, self.image, rect)
+        self.camera = camera
+
+        cx, cy = camera
+        mini_image = self.mini_image
+        for mini in self.mini_staffs:
+            mini_rect = mini_image.get_rect(center=(mini[0] - cx, mini[1] - cy))
+            queue.add(layer, mini_image, mini_rect)
+            self.drawn_rects.append(mini_rect)
+        origin = (self.x + offset[0], self.y + offset[1])  # Where the staff sprite is drawn this frame
+        queue.add_draw(layer, lambda surface: self.draw_bolts(surface, origin))
+
+    def draw_bolts(self, surface, origin):
+        # Lightning from mini-staffs and the main staff, in screen coordinates; the main bolts
+        # start at origin, the staff's drawn position
+        drawn = self.drawn_rects
+        cx, cy = self.camera
         for mini in self.mini_staffs:
-            # Draw mini-staff
-            mini_rect = mini_image.get_rect(center=(mini[0], mini[1]))
-            surface.blit(mini_image, mini_rect)
-
             # Draw lightning from mini-staff if it hit targets this frame
             if hasattr(self, 'mini_staff_targets') and tuple(mini) in self.mini_staff_targets:
                 mini_targets = self.mini_staff_targets[tuple(mini)]
                 for target in mini_targets[:self.current_chain_count()]:
-                    self.draw_lightning(surface, (mini[0], mini[1]), (target.x, target.y), 0.7)
+                    drawn.append(self.draw_lightning(surface, (mini[0] - cx, mini[1] - cy),
+                                                     (target.x - cx, target.y - cy), 0.7,
+                                                     key=(mini[0], mini[1], target)))
 
         # Draw main staff lightning
         if self.current_targets and self.zap_timer > self.current_cooldown() - 10:
-            start_pos = (self.x, self.y)
             for target in self.current_targets:
-                self.draw_lightning(surface, start_pos, (target.x, target.y))
+                drawn.append(self.draw_lightning(surface, origin, (target.x - cx, target.y - cy), key=target))
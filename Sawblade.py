@@ -4,10 +4,51 @@ import app
 import math 
 import random
 
+class SawbladeSprites:
+    # Rotated sawblade frames shared by every blade, keyed by (size, quantized angle).
+    # The source image is read from disk once; scaled and rotated frames are filled
+    # in lazily the first time a blade of that size reaches that angle.
+    ANGLE_STEP = 4  # Degrees between cached rotation frames
+    MAX_SIZES = 3  # Sizes kept around (old sizes drop out after "Larger Sawblade")
+
+    def __init__(self, path=os.path.join("assets", "Sawblade.png")):
+        self.path = path
+        self.source = None
+        self.scaled = {}  # size -> unrotated image
+        self.frames = {}  # size -> list of rotated images, one slot per ANGLE_STEP
+
+    def get_scaled(self, size):
+        image = self.scaled.get(size)
+        if image is None:
+            if self.source is None:
+                self.source = pygame.image.load(self.path).convert_alpha()  # Use convert_alpha for transparency
+            if len(self.scaled) >= self.MAX_SIZES: # Forget the oldest size
+                oldest = next(iter(self.scaled))
+                del self.scaled[oldest]
+                del self.frames[oldest]
+            # Always scale from the full-resolution source so repeated upgrades keep quality
+            image = pygame.transform.smoothscale(self.source, (size, size))
+            self.scaled[size] = image
+            self.frames[size] = [None] * (360 // self.ANGLE_STEP)
+        return image
+
+    def get_rotated(self, size, angle):
+        scaled = self.get_scaled(size)
+        frames = self.frames[size]
+        index = int(round(angle / self.ANGLE_STEP)) % len(frames)
+        image = frames[index]
+        if image is None:
+            image = pygame.transform.rotate(scaled, index * self.ANGLE_STEP)
+            frames[index] = image
+        return image
+
+sawblade_sprites = SawbladeSprites()
+
 class Sawblade:
     def __init__(self, x, y, size=60, speed=5, is_orbiting=False, orbit_offset=0, orbit_radius=None):
         self.x = x
         self.y = y
+        self.prev_x, self.prev_y = x, y  # Position at the start of the current step (for drawing)
         self.size = size
         self.speed = speed
         self.angle = 0  # Initial angle of rotation
@@ -29,16 +70,24 @@ class Sawblade:
         self.base_orbit_angle = 0  # Base angle for all orbiting sawblades
         self.parent_x = x
         self.parent_y = y
+        self.bounds = None  # World rect the main blade is kept inside (default: the screen)
 
-
-        sawblade_path = os.path.join("assets", "sawblade.png")  
-        self.original_image = pygame.image.load(sawblade_path).convert_alpha()  # Use convert_alpha for transparency
-        self.original_image = pygame.transform.scale(self.original_image, (self.size, self.size))  # Scale to new size
+        # Sprites come from the shared cache, so creating a blade never touches the disk
+        self.original_image = sawblade_sprites.get_scaled(self.size)
         self.image = self.original_image
         self.rect = self.image.get_rect(center=(self.x, self.y))
 
         self.rotation_speed = 26
 
+    def draw_rect(self, alpha=1.0, camera=(0, 0)): # Screen rect alpha of the way from the previous step
+        x = self.prev_x + (self.x - self.prev_x) * alpha - camera[0]
+        y = self.prev_y + (self.y - self.prev_y) * alpha - camera[1]
+        return self.image.get_rect(center=(x, y))
+
+    def set_size(self, size): # Resize the blade (used by the "Larger Sawblade" upgrade)
+        self.size = size
+        self.original_image = sawblade_sprites.get_scaled(size)
+
     def apply_movement(self, dx, dy):
         # Add to velocity based on input
         self.vx += dx * self.acceleration
@@ -58,28 +107,31 @@ class Sawblade:
             self.y += self.vy
             self.vx *= self.friction
             self.vy *= self.friction
-            self.x = max(0, min(app.WIDTH, self.x))
-            self.y = max(0, min(app.HEIGHT, self.y))
+            if self.bounds is None:
+                self.x = max(0, min(app.WIDTH, self.x))
+                self.y = max(0, min(app.HEIGHT, self.y))
+            else:
+                self.x = max(self.bounds.left, min(self.bounds.right, self.x))
+                self.y = max(self.bounds.top, min(self.bounds.bottom, self.y))
 
         # Update rect position first
         self.rect.center = (self.x, self.y)
         
-        # Then update rotation (changed from hardcoded 17)
+        # Then update rotation (changed from hardcoded 17); rotated frames are a cache lookup
         self.angle = (self.angle + self.rotation_speed) % 360
-        self.image = pygame.transform.rotate(self.original_image, self.angle)
+        self.image = sawblade_sprites.get_rotated(self.size, self.angle)
         # Keep the same center when updating rect with rotated image
         center = self.rect.center
         self.rect = self.image.get_rect()
         self.rect.center = center
 
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
-
-    def check_collision(self, enemies):
+    def check_collision(self, enemies, enemy_grid=None):
         if not self.active:
             return []
             
         collided_enemies = []
+        if enemy_grid is not None: # Only test enemies in grid cells around the blade
+            enemies = enemy_grid.query_rect(self.rect)
         for enemy in enemies:
             if self.rect.colliderect(enemy.rect):
                 if enemy.take_damage(self.damage): 
@@ -2,19 +2,49 @@
 import pygame
 import os
 
+import asset_cache
+
 # --------------------------------------------------------------------------
 #                               CONSTANTS
 # --------------------------------------------------------------------------
 
 WIDTH = 1280  # New width
 HEIGHT = 720  # New height
-FPS = 60
+FPS = 60  # Default render frame cap
+TICK_RATE = 60  # Simulation steps per second; every timer in the game counts these steps
+MAX_STEPS_PER_FRAME = 5  # Catch-up limit; beyond this the game slows down instead of spiralling
+
+WORLD_WIDTH = WIDTH * 16  # The play area; the camera shows one screen of it around the player
+WORLD_HEIGHT = HEIGHT * 16
+FLOOR_CHUNK_TILES = 8  # Floor chunks are this many tiles on each side
+FLOOR_CHUNK_CACHE = 48  # Rendered floor chunks kept in memory (least recently used are dropped)
+OBSTACLE_CHANCE = 0.3  # Share of floor chunks with a stone pillar (0 = open arena)
+FLOW_CELL_SIZE = 32  # Cells of the obstacle map and enemy flow field (one floor tile)
 
 PLAYER_SPEED = 3
 DEFAULT_ENEMY_SPEED = 1
 
 SPAWN_MARGIN = 50
 
+ENEMY_GRID_CELL_SIZE = 64  # Cell size of the spatial grid used for enemy proximity queries
+
+COIN_GRID_CELL_SIZE = 32  # Cell size of the spatial grid over dropped coins
+COIN_MERGE_RADIUS = 24  # A coin dropped this close to another one joins its stack
+COIN_PICKUP_RADIUS = 32  # Coins whose center is this close to the player's are picked up
+MAX_COINS = 300  # Beyond this many coins on the floor every drop joins a nearby stack (or replaces the oldest)
+COIN_STACK_RADIUS = 160  # How far a drop looks for a stack to join once MAX_COINS are on the floor
+
+DIRTY_RECT_MAX_SPRITES = 400  # Above this many enemies + coins the dirty-rect renderer just flips
+
+CULL_MARGIN = 64  # Sprites whose center is this far outside the view are still drawn and animated
+LOD_NEAR_MARGIN = 256  # Enemies within this distance of the view get a full update every tick
+LOD_FAR_INTERVAL = 4  # Enemies beyond it move once every this many ticks (staggered), covering the same ground
+
+SEPARATION_RADIUS = 28  # Enemies closer than this push each other apart
+SEPARATION_STRENGTH = 1.0  # Push per tick (px) from one fully overlapping neighbour
+SEPARATION_MAX_PUSH = 2.0  # Most an enemy is pushed in one tick, however crowded it is
+SEPARATION_MAX_PER_CELL = 8  # Enemies per crowd cell that take part (bounds the work when stacked)
+
 ENEMY_SCALE_FACTOR = 2
 PLAYER_SCALE_FACTOR = 2
 FLOOR_TILE_SCALE_FACTOR = 2
@@ -41,6 +71,9 @@ def load_frames(prefix, frame_count, scale_factor=1, folder="assets"):
         frames.append(img)
     return frames
 
+def flip_frames(frames): # Horizontally mirrored copies, made once at load time
+    return [pygame.transform.flip(frame, True, False) for frame in frames]
+
 def load_floor_tiles(folder="assets"):
     floor_tiles = []
     for i in range(8):
@@ -55,29 +88,67 @@ def load_floor_tiles(folder="assets"):
         floor_tiles.append(tile)
     return floor_tiles
 
+# How every cached sprite group is made: group -> (file prefix, frame count, scale factor, has alpha)
+ASSET_SPEC = {
+    "orc":         ("orc",         4, ENEMY_SCALE_FACTOR,      True),
+    "undead":      ("undead",      4, ENEMY_SCALE_FACTOR,      True),
+    "demon":       ("demon",       4, ENEMY_SCALE_FACTOR,      True),
+    "player_idle": ("player_idle", 4, PLAYER_SCALE_FACTOR,     True),
+    "player_run":  ("player_run",  4, PLAYER_SCALE_FACTOR,     True),
+    "floor_tiles": ("floor",       8, FLOOR_TILE_SCALE_FACTOR, False),
+    "health":      ("health",      6, HEALTH_SCALE_FACTOR,     True),
+}
+ASSET_CACHE_PATH = os.path.join("assets", "cache", "sprites.bin")
+
+def asset_sources(folder="assets"): # Every PNG the sprite groups are made from
+    return [os.path.join(folder, f"{prefix}_{i}.png")
+            for prefix, count, _, _ in ASSET_SPEC.values() for i in range(count)]
+
+def load_asset_groups(): # Every scaled sprite group, decoded from the PNGs
+    groups = {}
+    for name, (prefix, count, scale_factor, alpha) in ASSET_SPEC.items():
+        if alpha:
+            groups[name] = load_frames(prefix, count, scale_factor=scale_factor)
+        else: # Opaque floor tiles
+            groups[name] = load_floor_tiles()
+    return groups
+
+def write_asset_cache(groups):
+    try:
+        asset_cache.write_cache(ASSET_CACHE_PATH, groups, ASSET_SPEC, asset_sources())
+    except OSError: # Read-only install: just keep loading the PNGs
+        pass
+
 def load_assets():
+    # Sprites come from the packed cache when it is up to date, otherwise from the PNGs
+    # (which then refresh the cache for the next start)
+    groups = asset_cache.load_cache(ASSET_CACHE_PATH, ASSET_SPEC, asset_sources())
+    if groups is None:
+        groups = load_asset_groups()
+        write_asset_cache(groups)
+
     assets = {}
 
-    # Enemies
+    # Enemies (each entry is a (right, left) pair of frame lists)
     assets["enemies"] = {
-        "orc":    load_frames("orc",    4, scale_factor=ENEMY_SCALE_FACTOR),
-        "undead": load_frames("undead", 4, scale_factor=ENEMY_SCALE_FACTOR),
-        "demon":  load_frames("demon",  4, scale_factor=ENEMY_SCALE_FACTOR),
+        "orc":    (groups["orc"], flip_frames(groups["orc"])),
+        "undead": (groups["undead"], flip_frames(groups["undead"])),
+        "demon":  (groups["demon"], flip_frames(groups["demon"])),
     }
 
-    # Player
+    # Player (each entry is a (right, left) pair of frame lists)
     assets["player"] = {
-        "idle": load_frames("player_idle", 4, scale_factor=PLAYER_SCALE_FACTOR),
-        "run":  load_frames("player_run",  4, scale_factor=PLAYER_SCALE_FACTOR),
+        "idle": (groups["player_idle"], flip_frames(groups["player_idle"])),
+        "run":  (groups["player_run"], flip_frames(groups["player_run"])),
     }
 
     # Floor tiles
-    assets["floor_tiles"] = load_floor_tiles()
+    assets["floor_tiles"] = groups["floor_tiles"]
 
     # Health images
-    assets["health"] = load_frames("health", 6, scale_factor=HEALTH_SCALE_FACTOR)
+    assets["health"] = groups["health"]
 
     # Example coin image (uncomment if you have coin frames / images)
     # assets["coin"] = pygame.image.load(os.path.join("assets", "coin.png")).convert_alpha()
 
-    return assets
\ No newline at end of file
+    return assets
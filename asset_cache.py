@@ -0,0 +1,114 @@
+# asset_cache.py
+# Packed cache of the scaled game sprites. Decoding and scaling every PNG is most of
+# the startup time, so the finished surfaces are stored as raw pixel buffers in one
+# file. On startup the file is memory-mapped and each surface is made straight from
+# its slice with pygame.image.frombuffer. A manifest at the front records the layout,
+# the asset spec and the mtime of every source file; any change makes the cache stale
+# and the game falls back to the PNGs (and rewrites the cache).
+#
+# File layout: magic "SHAC", version u8, manifest length u32, manifest JSON, pixel data
+#
+#   python asset_cache.py      # (re)build the cache ahead of time
+import json
+import mmap
+import os
+import struct
+import time
+
+import pygame
+
+MAGIC = b"SHAC"
+VERSION = 1
+HEADER = struct.Struct("<4sBI")
+
+def source_mtimes(paths):
+    return {path: os.stat(path).st_mtime_ns for path in paths}
+
+def write_cache(path, groups, spec, sources):
+    # groups: name -> list of surfaces; spec: JSON-able description of how they were made
+    entries = {}
+    chunks = []
+    offset = 0
+    for name, surfaces in groups.items():
+        group_entries = []
+        for surface in surfaces:
+            fmt = "RGBA" if surface.get_flags() & pygame.SRCALPHA else "RGB"
+            data = pygame.image.tobytes(surface, fmt)
+            group_entries.append({"size": surface.get_size(), "format": fmt, "offset": offset, "length": len(data)})
+            chunks.append(data)
+            offset += len(data)
+        entries[name] = group_entries
+
+    manifest = json.dumps({"spec": spec, "sources": source_mtimes(sources), "groups": entries}).encode()
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f: # Written aside and swapped in, so a crash never leaves half a cache
+        f.write(HEADER.pack(MAGIC, VERSION, len(manifest)))
+        f.write(manifest)
+        for data in chunks:
+            f.write(data)
+    os.replace(temp_path, path)
+
+def load_cache(path, spec, sources):
+    # Surfaces by group name, or None when the cache is missing, stale or unreadable
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        magic, version, manifest_length = HEADER.unpack_from(mapped, 0)
+        if magic != MAGIC or version != VERSION:
+            return None
+        manifest = json.loads(mapped[HEADER.size:HEADER.size + manifest_length])
+        # JSON round trip so tuples in the spec compare equal to the stored lists
+        if manifest["spec"] != json.loads(json.dumps(spec)):
+            return None
+        if manifest["sources"] != source_mtimes(sources):
+            return None
+
+        base = HEADER.size + manifest_length
+        view = memoryview(mapped)
+        groups = {}
+        for name, entries in manifest["groups"].items():
+            surfaces = []
+            for entry in entries:
+                start = base + entry["offset"]
+                image = pygame.image.frombuffer(view[start:start + entry["length"]], entry["size"], entry["format"])
+                # Copy into the display's pixel format (fast blits, and the map can go)
+                surfaces.append(image.convert_alpha() if entry["format"] == "RGBA" else image.convert())
+            groups[name] = surfaces
+        return groups
+    except (OSError, ValueError, KeyError, struct.error, pygame.error):
+        return None
+    finally:
+        view = None
+        try:
+            mapped.close()
+        except BufferError: # A surface still shares a slice; the map is freed with it
+            pass
+
+def main():
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.init()
+    pygame.display.set_mode((1, 1))  # convert() needs a display surface
+
+    import app
+    start = time.perf_counter()
+    groups = app.load_asset_groups()
+    png_time = time.perf_counter() - start
+    app.write_asset_cache(groups)
+
+    start = time.perf_counter()
+    cached = load_cache(app.ASSET_CACHE_PATH, app.ASSET_SPEC, app.asset_sources())
+    cache_time = time.perf_counter() - start
+    count = sum(len(surfaces) for surfaces in groups.values())
+    print(f"wrote {count} surfaces to {app.ASSET_CACHE_PATH} ({os.path.getsize(app.ASSET_CACHE_PATH)} bytes): "
+          f"png {png_time * 1000:.1f}ms, cache {cache_time * 1000:.1f}ms, valid={cached is not None}")
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,229 @@
+# batch.py
+# Balance runner: plays many seeded headless games in a process pool (one game per
+# task) and aggregates survival time, kill rate, XP/level curves and per-tick cost
+# per weapon into one compact JSON file that can be compared between builds.
+#
+#   python batch.py --runs 32 --ticks 18000 --output batch_results.json
+#   python batch.py --policy scripted --move collect --compare old_results.json
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import app
+
+WEAPONS = ["bullet", "sawblade", "lightning"]
+
+# Upgrade priorities for the scripted policy: the first listed upgrade that is on
+# offer is taken, otherwise one of the offered upgrades at random
+SCRIPTED_UPGRADES = {
+    "bullet": ["Extra Bullet", "Shorter Cooldown", "Triple Shot", "Rapid Fire", "Bigger Bullet", "Faster Bullet"],
+    "sawblade": ["Orbit Sawblade", "Sharper Sawblade", "Larger Sawblade", "Faster Spin", "Faster Orbit"],
+    "lightning": ["targets", "damage", "range", "mini_count", "mini_chance", "mini_damage", "mini_duration"],
+}
+
+def pick_upgrade(game, policy):
+    options = game.upgrade_options
+    if policy == "scripted":
+        for wanted in SCRIPTED_UPGRADES[game.weapon_choice]:
+            for option in options:
+                if wanted in (option["name"], option.get("type")):
+                    return option
+    return random.choice(options)
+
+def collect_input(game):
+    # Movement bot: step away from an enemy that gets close, otherwise walk to the nearest coin
+    player = game.player
+    keys = defaultdict(bool)
+    threat = game.enemy_grid.nearest(player.x, player.y, k=1, max_dist=80)
+    if threat:
+        dx, dy = player.x - threat[0].x, player.y - threat[0].y
+    else:
+        coin = game.coins.grid.nearest(player.x, player.y, k=1)
+        if not coin:
+            return keys
+        dx, dy = coin[0].x - player.x, coin[0].y - player.y
+    keys[app.pygame.K_RIGHT] = dx > player.speed
+    keys[app.pygame.K_LEFT] = dx < -player.speed
+    keys[app.pygame.K_DOWN] = dy > player.speed
+    keys[app.pygame.K_UP] = dy < -player.speed
+    return keys
+
+def run_game(job):
+    # One full game in a worker process; returns a per-run summary
+    from game import Game  # Imported here so every worker initialises pygame itself
+
+    game = Game(headless=True, seed=job["seed"], weapon=job["weapon"], max_ticks=job["ticks"])
+    if job["move"] == "collect":
+        game.input_source = collect_input
+    if job["spawn_interval"] is not None:
+        game.enemy_spawn_interval = job["spawn_interval"]
+    if job["enemies_per_spawn"] is not None:
+        game.enemies_per_spawn = job["enemies_per_spawn"]
+
+    sample_every = job["sample_every"]
+    xp_curve, level_curve, kill_curve = [], [], []
+    tick_times = []
+    clock = time.perf_counter
+    while game.ticks < job["ticks"] and not game.game_over:
+        if game.in_level_up_menu:
+            game.apply_upgrade(game.player, pick_upgrade(game, job["policy"]))
+            game.in_level_up_menu = False
+        start = clock()
+        game.update()
+        tick_times.append(clock() - start)
+        game.ticks += 1
+        if game.ticks % sample_every == 0:
+            xp_curve.append(game.player.xp)
+            level_curve.append(game.player.level)
+            kill_curve.append(game.kills)
+
+    minutes = game.ticks / app.TICK_RATE / 60
+    tick_ms = np.array(tick_times) * 1000
+    result = {
+        "weapon": job["weapon"],
+        "seed": job["seed"],
+        "ticks": game.ticks,
+        "died": game.game_over,
+        "kills": game.kills,
+        "kills_per_minute": round(game.kills / minutes, 3) if minutes else 0.0,
+        "xp": game.player.xp,
+        "level": game.player.level,
+        "xp_curve": xp_curve,
+        "level_curve": level_curve,
+        "kill_curve": kill_curve,
+        "tick_ms": {
+            "p50": round(float(np.percentile(tick_ms, 50)), 4),
+            "p99": round(float(np.percentile(tick_ms, 99)), 4),
+            "mean": round(float(tick_ms.mean()), 4),
+        } if len(tick_ms) else None,
+        "tick_ms_samples": tick_ms,
+    }
+    app.pygame.quit()
+    return result
+
+def mean_curve(curves, length): # Runs that ended early keep their last value
+    if not curves or length == 0:
+        return []
+    padded = [curve + [curve[-1] if curve else 0] * (length - len(curve)) for curve in curves]
+    return [round(float(value), 3) for value in np.mean(padded, axis=0)]
+
+def aggregate(runs, ticks, sample_every):
+    # Summary per weapon across every seed
+    length = ticks // sample_every
+    summary = {}
+    for weapon in WEAPONS:
+        weapon_runs = [run for run in runs if run["weapon"] == weapon]
+        if not weapon_runs:
+            continue
+        survival = np.array([run["ticks"] for run in weapon_runs]) / app.TICK_RATE
+        tick_ms = np.concatenate([run["tick_ms_samples"] for run in weapon_runs])
+        summary[weapon] = {
+            "runs": len(weapon_runs),
+            "death_rate": round(sum(run["died"] for run in weapon_runs) / len(weapon_runs), 3),
+            "survival_s": {"mean": round(float(survival.mean()), 2), "p50": round(float(np.median(survival)), 2),
+                           "min": round(float(survival.min()), 2)},
+            "kills_per_minute": round(float(np.mean([run["kills_per_minute"] for run in weapon_runs])), 3),
+            "final_level": round(float(np.mean([run["level"] for run in weapon_runs])), 3),
+            "xp_curve": mean_curve([run["xp_curve"] for run in weapon_runs], length),
+            "level_curve": mean_curve([run["level_curve"] for run in weapon_runs], length),
+            "kill_curve": mean_curve([run["kill_curve"] for run in weapon_runs], length),
+            "tick_ms": {
+                "p50": round(float(np.percentile(tick_ms, 50)), 4),
+                "p95": round(float(np.percentile(tick_ms, 95)), 4),
+                "p99": round(float(np.percentile(tick_ms, 99)), 4),
+                "mean": round(float(tick_ms.mean()), 4),
+            },
+        }
+    return summary
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(summary, old_path): # Print the change of each headline number against an older results file
+    with open(old_path) as f:
+        old = json.load(f)["summary"]
+    for weapon, stats in summary.items():
+        if weapon not in old:
+            continue
+        before = old[weapon]
+        rows = [
+            ("survival_s.mean", before["survival_s"]["mean"], stats["survival_s"]["mean"]),
+            ("death_rate", before["death_rate"], stats["death_rate"]),
+            ("kills_per_minute", before["kills_per_minute"], stats["kills_per_minute"]),
+            ("final_level", before["final_level"], stats["final_level"]),
+            ("tick_ms.p50", before["tick_ms"]["p50"], stats["tick_ms"]["p50"]),
+            ("tick_ms.p99", before["tick_ms"]["p99"], stats["tick_ms"]["p99"]),
+        ]
+        for name, a, b in rows:
+            change = f"{(b - a) / a * 100:+7.1f}%" if a else "      -"
+            print(f"{weapon:<10}{name:<20}{a:>10}  ->{b:>10}  {change}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many seeded headless games and aggregate balance stats")
+    parser.add_argument("--runs", type=int, default=16, help="games per weapon")
+    parser.add_argument("--ticks", type=int, default=18000, help="tick limit per game (18000 = 5 minutes)")
+    parser.add_argument("--seed", type=int, default=1, help="first seed; runs use seed, seed+1, ...")
+    parser.add_argument("--weapon", action="append", choices=WEAPONS, help="only these weapons (repeatable)")
+    parser.add_argument("--policy", choices=["random", "scripted"], default="random", help="upgrade choice policy")
+    parser.add_argument("--move", choices=["idle", "collect"], default="idle",
+                        help="idle: the player stands still; collect: dodge close enemies and walk to coins")
+    parser.add_argument("--spawn-interval", type=int, help="override Game.enemy_spawn_interval")
+    parser.add_argument("--enemies-per-spawn", type=int, help="override the starting Game.enemies_per_spawn")
+    parser.add_argument("--sample-every", type=int, default=600, help="ticks between curve samples")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--output", default="batch_results.json")
+    parser.add_argument("--compare", metavar="PATH", help="results file of another build to compare against")
+    args = parser.parse_args()
+
+    weapons = args.weapon or WEAPONS
+    jobs = [{"weapon": weapon, "seed": args.seed + i, "ticks": args.ticks, "policy": args.policy,
+             "move": args.move, "spawn_interval": args.spawn_interval,
+             "enemies_per_spawn": args.enemies_per_spawn, "sample_every": args.sample_every}
+            for weapon in weapons for i in range(args.runs)]
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        runs = list(pool.map(run_game, jobs))
+    elapsed = time.perf_counter() - start
+
+    summary = aggregate(runs, args.ticks, args.sample_every)
+    for run in runs:
+        del run["tick_ms_samples"]  # Only the percentiles go in the file
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pygame": app.pygame.version.ver,
+            "numpy": np.__version__,
+            "seconds": round(elapsed, 2),
+            "config": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        },
+        "summary": summary,
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, separators=(",", ":"))
+
+    for weapon, stats in summary.items():
+        print(f"{weapon:<10} survival={stats['survival_s']['mean']:8.1f}s deaths={stats['death_rate']:.0%} "
+              f"kills/min={stats['kills_per_minute']:7.1f} level={stats['final_level']:5.2f} "
+              f"tick p50={stats['tick_ms']['p50']:.3f}ms p99={stats['tick_ms']['p99']:.3f}ms")
+    print(f"{len(runs)} games in {elapsed:.1f}s, wrote {args.output}")
+    if args.compare:
+        compare(summary, args.compare)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+# benchmark.py
+# Scenario benchmarks: builds Game states with preset loads, times every update
+# phase and draw() separately over N ticks and writes p50/p95/p99 per phase as JSON.
+#
+#   python benchmark.py --ticks 300 --output bench_results.json
+#   python benchmark.py --scenario lightning_5k_enemies
+import argparse
+import json
+import math
+import platform
+import random
+import time
+
+import numpy as np
+import pygame
+
+from game import Game
+from enemy import Enemy
+from camera import view_rect
+
+WEAPONS = ["bullet", "sawblade", "lightning"]
+ENEMY_LOADS = {"100": 100, "1k": 1000, "5k": 5000, "20k": 20000}
+
+# Upgrades applied (in order, repeated) to reach a maxed-out build for each weapon
+MAX_BUILDS = {
+    "bullet": ["Extra Bullet"] * 8 + ["Shorter Cooldown"] * 10 + ["Bigger Bullet"] * 3 + ["Faster Bullet"] * 3,
+    "sawblade": ["Orbit Sawblade"] * 8 + ["Larger Sawblade"] * 4 + ["Faster Spin"] * 2 + ["Sharper Sawblade"] * 5,
+    "lightning": ["targets"] * 2 + ["range"] * 5 + ["damage"] * 5 + ["mini_count"] * 5
+                 + ["mini_chance"] * 5 + ["mini_damage"] * 5 + ["mini_duration"] * 5,
+}
+
+def build_scenarios():
+    scenarios = []
+    for weapon in WEAPONS:
+        for label, count in ENEMY_LOADS.items():
+            scenarios.append({"name": f"{weapon}_{label}_enemies", "weapon": weapon,
+                              "enemies": count, "coins": 0, "max_build": False, "radius": 700})
+        scenarios.append({"name": f"{weapon}_max_build", "weapon": weapon,
+                          "enemies": 1000, "coins": 0, "max_build": True, "radius": 700})
+    scenarios.append({"name": "coin_field", "weapon": "lightning",
+                      "enemies": 100, "coins": 20000, "max_build": False, "radius": 700})
+    # Most of the horde far off screen: cost should follow the few thousand near the view
+    scenarios.append({"name": "lightning_20k_spread", "weapon": "lightning",
+                      "enemies": 20000, "coins": 0, "max_build": False, "radius": 6000})
+    return scenarios
+
+def spawn_enemy_ring(game, count, radius=700):
+    # Enemies scattered around the player, away from the centre so the player is not swarmed at once
+    types = list(game.assets["enemies"].keys())
+    for _ in range(count):
+        angle = random.uniform(0, 2 * math.pi)
+        dist = random.uniform(150, radius)
+        x = game.player.x + math.cos(angle) * dist
+        y = game.player.y + math.sin(angle) * dist
+        Enemy(x, y, random.choice(types), game.assets["enemies"], level=game.player.level, store=game.enemies)
+
+def apply_max_build(game):
+    player = game.player
+    for upgrade in MAX_BUILDS[game.weapon_choice]:
+        if game.weapon_choice == "lightning":
+            game.apply_upgrade(player, {"name": upgrade, "type": upgrade})
+        else:
+            game.apply_upgrade(player, {"name": upgrade})
+
+def make_game(scenario, seed):
+    game = Game(headless=True, seed=seed, weapon=scenario["weapon"])
+    game.player.take_damage = lambda amount: None  # Keep the player alive so the load stays put
+    if scenario["max_build"]:
+        apply_max_build(game)
+    spawn_enemy_ring(game, scenario["enemies"], scenario["radius"])
+    view = view_rect(game.player.x, game.player.y)  # Coins cover the screen around the player
+    for _ in range(scenario["coins"]):
+        game.coins.spawn(random.uniform(view.left, view.right), random.uniform(view.top, view.bottom))
+    return game
+
+def percentiles(samples): # Milliseconds
+    values = np.array(samples) * 1000
+    return {
+        "p50": round(float(np.percentile(values, 50)), 4),
+        "p95": round(float(np.percentile(values, 95)), 4),
+        "p99": round(float(np.percentile(values, 99)), 4),
+        "mean": round(float(values.mean()), 4),
+    }
+
+def run_scenario(scenario, ticks, seed):
+    game = make_game(scenario, seed)
+    timings = {name: [] for name, _ in game.update_phases}
+    timings["update_total"] = []
+    timings["draw"] = []
+    clock = time.perf_counter
+
+    for _ in range(ticks):
+        # Top the enemy count back up outside the timed region so the load stays constant
+        missing = scenario["enemies"] - len(game.enemies)
+        if missing > 0:
+            spawn_enemy_ring(game, missing, scenario["radius"])
+        game.in_level_up_menu = False
+
+        update_start = clock()
+        for name, phase in game.update_phases:
+            start = clock()
+            phase()
+            timings[name].append(clock() - start)
+        timings["update_total"].append(clock() - update_start)
+
+        start = clock()
+        game.draw()
+        timings["draw"].append(clock() - start)
+
+    result = {
+        "weapon": scenario["weapon"],
+        "enemies": scenario["enemies"],
+        "coins": scenario["coins"],
+        "max_build": scenario["max_build"],
+        "ticks": ticks,
+        "phases_ms": {name: percentiles(samples) for name, samples in timings.items()},
+    }
+    pygame.quit()
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-phase frame cost benchmarks")
+    parser.add_argument("--ticks", type=int, default=300, help="ticks to time per scenario")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--scenario", action="append",
+                        help="only run scenarios whose name contains this text (repeatable)")
+    parser.add_argument("--output", default="bench_results.json")
+    args = parser.parse_args()
+
+    scenarios = build_scenarios()
+    if args.scenario:
+        scenarios = [s for s in scenarios if any(text in s["name"] for text in args.scenario)]
+
+    results = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "numpy": np.__version__,
+            "ticks": args.ticks,
+            "seed": args.seed,
+        },
+        "scenarios": {},
+    }
+    for scenario in scenarios:
+        result = run_scenario(scenario, args.ticks, args.seed)
+        results["scenarios"][scenario["name"]] = result
+        phases = result["phases_ms"]
+        print(f"{scenario['name']:<28} update p50={phases['update_total']['p50']:8.3f}ms "
+              f"p99={phases['update_total']['p99']:8.3f}ms  draw p50={phases['draw']['p50']:8.3f}ms")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+# boot.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class BootLoader:
+    # Staged startup. Slow loads are submitted to one background thread (so they run in
+    # submission order and can rely on earlier results) and are only waited for when the
+    # game first needs them. Every stage, wait and the first presented frame is recorded
+    # on a timeline measured from boot start.
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="boot")
+        self.futures = {}
+        self.results = {}  # Finished loads, so waiting again costs one dict lookup
+        self.timeline = []  # (stage, thread, start ms, end ms)
+        self.first_frame_ms = None
+        self.lock = threading.Lock()
+
+    def now_ms(self):
+        return (time.perf_counter() - self.start) * 1000
+
+    def record(self, stage, start_ms):
+        with self.lock:
+            self.timeline.append((stage, threading.current_thread().name, start_ms, self.now_ms()))
+
+    def stage(self, name, func, *args): # Run a stage now, on this thread
+        start_ms = self.now_ms()
+        result = func(*args)
+        self.record(name, start_ms)
+        return result
+
+    def submit(self, name, func, *args): # Queue a stage on the boot thread
+        def task():
+            start_ms = self.now_ms()
+            result = func(*args)
+            self.record(name, start_ms)
+            return result
+        self.futures[name] = self.executor.submit(task)
+
+    def wait(self, name): # Result of a queued stage, blocking until it is done
+        try:
+            return self.results[name]
+        except KeyError:
+            pass
+        future = self.futures[name]
+        if future.done():
+            result = future.result()
+        else:
+            start_ms = self.now_ms()
+            result = future.result()
+            self.record("wait " + name, start_ms)
+        self.results[name] = result
+        return result
+
+    def first_frame(self): # Call after every display flip; only the first one is recorded
+        if self.first_frame_ms is None:
+            self.first_frame_ms = self.now_ms()
+            self.record("first frame", self.first_frame_ms)
+
+    def shutdown(self): # Let queued loads finish (they may still touch pygame) before pygame.quit
+        self.executor.shutdown(wait=True)
+
+    def report(self):
+        lines = [f"{'stage':<22}{'thread':<14}{'start':>9}{'end':>9}{'ms':>9}"]
+        for stage, thread, start_ms, end_ms in sorted(self.timeline, key=lambda event: event[2]):
+            lines.append(f"{stage:<22}{thread:<14}{start_ms:9.1f}{end_ms:9.1f}{end_ms - start_ms:9.1f}")
+        return "\n".join(lines)
@@ -1,26 +1,136 @@
 # bullet.py
+import numpy as np
 import app
+from entities import EntityContainer
 
-class Bullet:
-    def __init__(self, x, y, vx, vy, size, damage=6):
-        # Position and movement
-        self.x, self.y = x, y
-        self.vx, self.vy = vx, vy
-        
-        # Properties
-        self.size = size
-        self.damage = damage
-
-        # Visual setup
-        self.image = app.pygame.Surface((size, size), app.pygame.SRCALPHA)
-        self.image.fill((255, 255, 255))
-        self.rect = self.image.get_rect(center=(x, y))
-
-    def update(self):
-        # Move bullet
-        self.x += self.vx
-        self.y += self.vy
-        self.rect.center = (self.x, self.y)
-        
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
\ No newline at end of file
+bullet_images = {}  # One shared sprite per bullet size
+
+def get_bullet_image(size):
+    image = bullet_images.get(size)
+    if image is None:
+        image = app.pygame.Surface((size, size), app.pygame.SRCALPHA)
+        image.fill((255, 255, 255))
+        bullet_images[size] = image
+    return image
+
+class BulletPool(EntityContainer):
+    # All live bullets in preallocated arrays, slots 0..count-1. A bullet that leaves
+    # the screen or is used up is discard()ed and swap-removed at compact() (the last
+    # bullet takes its slot); until then it no longer hits anything.
+    def __init__(self, capacity=128):
+        super().__init__()
+        self.capacity = capacity
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position at the start of the current step (for drawing)
+        self.prev_y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.damage = np.zeros(capacity)
+        self.size = np.zeros(capacity, dtype=np.int64)
+        self.pierce = np.zeros(capacity, dtype=np.int64)  # Extra enemies a bullet can pass through
+        self.hits = [None] * capacity  # Enemies each bullet already hit, so it hits each one only once
+
+    @property
+    def count(self):
+        return len(self.handles)
+
+    def grow(self): # Double capacity; only happens until the pool fits the heaviest build
+        new_capacity = self.capacity * 2
+        for name in ("x", "y", "prev_x", "prev_y", "vx", "vy", "damage", "size", "pierce"):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.hits.extend([None] * (new_capacity - self.capacity))
+        self.capacity = new_capacity
+
+    def spawn(self, x, y, vx, vy, size, damage=6, pierce=0): # Returns the bullet's handle
+        if self.count == self.capacity:
+            self.grow()
+        handle, i = self._allocate()
+        self.x[i], self.y[i] = x, y
+        self.prev_x[i], self.prev_y[i] = x, y
+        self.vx[i], self.vy[i] = vx, vy
+        self.size[i] = size
+        self.damage[i] = damage
+        self.pierce[i] = pierce
+        self.hits[i] = set()
+        return handle
+
+    def _move(self, src, dst):
+        for arr in (self.x, self.y, self.prev_x, self.prev_y, self.vx, self.vy, self.damage, self.size, self.pierce):
+            arr[dst] = arr[src]
+        self.hits[dst] = self.hits[src]
+
+    def _pop(self):
+        self.hits[len(self.handles)] = None
+
+    def rect(self, i):
+        size = int(self.size[i])
+        rect = app.pygame.Rect(0, 0, size, size)
+        rect.center = (self.x[i], self.y[i])
+        return rect
+
+    def store_previous_positions(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def update(self, bounds=None): # bounds: world rect bullets are culled outside of (default: the screen)
+        n = self.count
+        if n == 0:
+            return
+        # Move every bullet at once
+        x, y = self.x[:n], self.y[:n]
+        x += self.vx[:n]
+        y += self.vy[:n]
+
+        # Cull bullets that left the view on any edge
+        if bounds is None:
+            bounds = app.pygame.Rect(0, 0, app.WIDTH, app.HEIGHT)
+        off_screen = (x < bounds.left) | (x > bounds.right) | (y < bounds.top) | (y > bounds.bottom)
+        if off_screen.any():
+            handles = self.handles
+            for i in np.flatnonzero(off_screen).tolist():
+                self.discard(handles[i])
+
+    def collide(self, enemy_grid):
+        # Damage enemies under each bullet. A bullet hits an enemy at most once and is
+        # used up after hitting 1 + pierce enemies. Returns the enemies killed.
+        killed = []
+        handles = self.handles
+        pending = self.pending
+        for i in range(self.count):
+            if handles[i] in pending: # Off screen or already used up
+                continue
+            rect = self.rect(i)
+            hits = self.hits[i]
+            for enemy in enemy_grid.query_rect(rect):
+                if enemy.health <= 0 or enemy in hits:  # Already dead or already hit
+                    continue
+                hits.add(enemy)
+                if enemy.take_damage(self.damage[i]):
+                    killed.append(enemy)
+                self.pierce[i] -= 1
+                if self.pierce[i] < 0:
+                    self.discard(handles[i])
+                    break
+        return killed
+
+    def rects(self, camera=(0, 0)):
+        cx, cy = camera
+        return [self.rect(i).move(-cx, -cy) for i in range(self.count)]
+
+    def submit(self, queue, layer="weapons", alpha=1.0, camera=(0, 0)):
+        n = self.count
+        if n == 0:
+            return
+        # Drawn alpha of the way from the previous step's position to the current one
+        xs = self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha - camera[0]
+        ys = self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha - camera[1]
+        pairs = []
+        for x, y, size in zip(xs.tolist(), ys.tolist(), self.size[:n].tolist()):
+            image = get_bullet_image(size)
+            pairs.append((image, image.get_rect(center=(x, y))))
+        queue.extend(layer, pairs)
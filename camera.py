@@ -0,0 +1,32 @@
+# camera.py
+import pygame
+import app
+
+def view_rect(x, y, width=app.WIDTH, height=app.HEIGHT):
+    # World area shown when the view is centered on (x, y), kept inside the world
+    left = min(max(round(x - width / 2), 0), app.WORLD_WIDTH - width)
+    top = min(max(round(y - height / 2), 0), app.WORLD_HEIGHT - height)
+    return pygame.Rect(left, top, width, height)
+
+class Camera:
+    # Top-left corner of the screen in world coordinates. Everything in the world is
+    # drawn at its world position minus (x, y).
+    def __init__(self):
+        self.x = 0
+        self.y = 0
+
+    @property
+    def offset(self):
+        return (self.x, self.y)
+
+    def follow(self, x, y): # Center the view on (x, y); returns True when the camera moved
+        left, top = view_rect(x, y).topleft
+        moved = (left, top) != (self.x, self.y)
+        self.x, self.y = left, top
+        return moved
+
+    def to_world(self, pos): # Screen position (e.g. the mouse) to world position
+        return (pos[0] + self.x, pos[1] + self.y)
+
+    def to_screen(self, pos):
+        return (pos[0] - self.x, pos[1] - self.y)
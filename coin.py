@@ -1,12 +1,103 @@
+from collections import deque
+
 import pygame
+import app
+from entities import EntityList
+from spatial_grid import SpatialGrid
+
+coin_image = None  # One shared sprite for every coin
+
+def get_coin_image():
+    global coin_image
+    if coin_image is None:
+        coin_image = pygame.Surface((15, 15), pygame.SRCALPHA)
+        coin_image.fill((255, 215, 0))  # Gold color
+    return coin_image
 
 class Coin:
-    def __init__(self, x, y):
-        # Setup coin visual and position
+    def __init__(self, x, y, value=1):
+        self.image = get_coin_image()
+        self.rect = self.image.get_rect()
+        self.handle = None
+        self.reset(x, y, value)
+
+    def reset(self, x, y, value=1): # Reuse a pooled coin at a new position
         self.x, self.y = x, y
-        self.image = pygame.Surface((15, 15), pygame.SRCALPHA)
-        self.image.fill((255, 215, 0))  # Gold color
-        self.rect = self.image.get_rect(center=(x, y))
+        self.value = value  # XP given when picked up (merged coins stack their values)
+        self.rect.center = (x, y)
+
+class CoinField(EntityList):
+    # Every dropped coin. Coins that land near an existing coin are merged into it
+    # as a higher-value stack, and once max_coins are on the floor new drops join a
+    # stack within stack_radius, or else replace the oldest coin (taking its value with
+    # them), so the live count stays bounded and kills still drop a coin where the enemy
+    # died. Coins are indexed in a spatial grid (they never move) for the merge and
+    # pickup queries, and collected coins go back to a free list instead of being
+    # thrown away.
+    def __init__(self, merge_radius=app.COIN_MERGE_RADIUS, max_coins=app.MAX_COINS,
+                 stack_radius=app.COIN_STACK_RADIUS):
+        super().__init__()
+        self.merge_radius = merge_radius
+        self.max_coins = max_coins
+        self.stack_radius = stack_radius
+        self.grid = SpatialGrid(app.COIN_GRID_CELL_SIZE)
+        self.free = []  # Collected coins waiting to be reused
+        self.order = deque()  # (handle, coin) in drop order; entries whose handle is gone are stale
+
+    def spawn(self, x, y, value=1): # Drop coin value at (x, y); returns the coin holding it
+        nearby = self.grid.nearest(x, y, k=1, max_dist=self.merge_radius)
+        if not nearby and len(self) - len(self.pending) >= self.max_coins:
+            nearby = self.grid.nearest(x, y, k=1, max_dist=self.stack_radius)
+            if not nearby: # Nothing close: the oldest coin's value moves here instead
+                value += self.evict_oldest()
+        if nearby:
+            stack = nearby[0]
+            stack.value += value
+            return stack
+
+        if self.free:
+            coin = self.free.pop()
+            coin.reset(x, y, value)
+        else:
+            coin = Coin(x, y, value)
+        self.add(coin)
+        self.grid.insert(coin)
+        self.order.append((coin.handle, coin))
+        if len(self.order) > 2 * self.max_coins: # Drop stale entries left by collected coins
+            self.order = deque(entry for entry in self.order if self.alive(entry[0]))
+        return coin
+
+    def evict_oldest(self): # Remove the longest-lying coin; returns its value
+        order = self.order
+        while order:
+            handle, coin = order.popleft()
+            if self.alive(handle):
+                self.grid.remove(coin)
+                self.discard(handle)  # Leaves the list at compact()
+                return coin.value
+        return 0
+
+    def collect(self, x, y, radius): # Pick up every coin within radius; returns the total value
+        value = 0
+        for coin in self.grid.query_radius(x, y, radius):
+            value += coin.value
+            self.grid.remove(coin)
+            self.discard(coin.handle)  # Leaves the list at compact()
+        return value
+
+    def _removing(self, slot):
+        self.free.append(self.items[slot])
+
+    def clear(self):
+        super().clear()
+        self.grid.clear()
+        self.order.clear()
+
+    def visible(self, camera=(0, 0)): # Coins on screen, from the grid instead of every coin
+        cx, cy = camera
+        margin = app.CULL_MARGIN
+        return self.grid.query_cells(cx - margin, cy - margin, cx + app.WIDTH + margin, cy + app.HEIGHT + margin)
 
-    def draw(self, surface):
-        surface.blit(self.image, self.rect)
\ No newline at end of file
+    def submit(self, queue, layer="coins", camera=(0, 0)):
+        cx, cy = camera
+        queue.extend(layer, [(coin.image, coin.rect.move(-cx, -cy)) for coin in self.visible(camera)])
@@ -0,0 +1,93 @@
+# crowd.py
+import numpy as np
+
+# Neighbour cells visited from each cell; with the cell itself this covers every
+# neighbouring pair of cells exactly once
+FORWARD_CELLS = ((1, -1), (1, 0), (1, 1), (0, 1))
+# Crowds up to this size compare every pair directly: sorting into cells costs more
+# than it saves until the crowd is a few hundred strong
+DIRECT_MAX = 128
+
+def separation(xs, ys, radius, max_per_cell):
+    # Push that moves each point away from the others closer than radius, for the whole
+    # crowd at once. Points are sorted into cells radius wide and only points in the
+    # same or neighbouring cells are compared, each pair once. At most max_per_cell
+    # points of a cell take part, so the work stays linear in the crowd size even when
+    # everyone is stacked on one spot (the rest join in as the first ones spread out).
+    # Crowds of up to DIRECT_MAX points skip the cells and compare every pair.
+    # Each close pair pushes both points apart by (radius - distance) / radius along the
+    # line between them. Returns (push_x, push_y) arrays in the order of xs, ys.
+    n = len(xs)
+    push_x = np.zeros(n)
+    push_y = np.zeros(n)
+    if n < 2:
+        return push_x, push_y
+    if n <= DIRECT_MAX:
+        a, b = np.triu_indices(n, 1)
+        return pair_pushes(xs, ys, a, b, radius, n)
+
+    cx = np.floor_divide(xs, radius).astype(np.int64)
+    cy = np.floor_divide(ys, radius).astype(np.int64)
+    cx -= cx.min()
+    cy -= cy.min() - 1  # Room for the neighbour offsets above and below
+    span = int(cy.max()) + 2
+    codes = cx * span + cy
+    order = np.argsort(codes, kind="stable")
+    codes = codes[order]
+    sx, sy = xs[order], ys[order]
+    starts = np.flatnonzero(np.diff(codes)) + 1
+    starts = np.concatenate(([0], starts))
+    cells = codes[starts]
+    counts = np.minimum(np.diff(np.append(starts, n)), max_per_cell)
+
+    # (a, b) pairs of sorted positions: the cell with itself, then with its forward neighbours
+    pairs_a, pairs_b = [], []
+    own = np.arange(len(cells))
+    for ox, oy in ((0, 0),) + FORWARD_CELLS:
+        if ox == 0 and oy == 0:
+            first, second = own, own
+        else:
+            target = cells + ox * span + oy
+            found = np.minimum(np.searchsorted(cells, target), len(cells) - 1)
+            first = np.flatnonzero(cells[found] == target)
+            second = found[first]
+        size_a, size_b = counts[first], counts[second]
+        sizes = size_a * size_b
+        k = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        step = np.repeat(size_b, sizes)
+        a = np.repeat(starts[first], sizes) + k // step
+        b = np.repeat(starts[second], sizes) + k % step
+        if ox == 0 and oy == 0:
+            keep = a < b
+            a, b = a[keep], b[keep]
+        pairs_a.append(a)
+        pairs_b.append(b)
+    a = np.concatenate(pairs_a)
+    b = np.concatenate(pairs_b)
+
+    push_x[order], push_y[order] = pair_pushes(sx, sy, a, b, radius, n)
+    return push_x, push_y
+
+def pair_pushes(xs, ys, a, b, radius, n):
+    # Pushes on n points from the candidate pairs (a, b) that are closer than radius
+    dx = xs[a] - xs[b]
+    dy = ys[a] - ys[b]
+    dist_sq = dx * dx + dy * dy
+    close = np.flatnonzero(dist_sq < radius * radius)
+    a, b, dx, dy = a[close], b[close], dx[close], dy[close]
+    dist = np.sqrt(dist_sq[close])
+    stacked = dist == 0
+    dist[stacked] = 1.0
+    scale = (radius - dist) / (radius * dist)
+    fx = dx * scale
+    fy = dy * scale
+    if stacked.any(): # Points on the exact same spot split along a direction picked from their order
+        angle = (a[stacked] + b[stacked]) * 2.399963
+        fx[stacked] = np.cos(angle)
+        fy[stacked] = np.sin(angle)
+    # bincount of empty pairs comes back as integers, so the sums go into float arrays
+    push_x = np.zeros(n)
+    push_y = np.zeros(n)
+    push_x += np.bincount(a, weights=fx, minlength=n) - np.bincount(b, weights=fx, minlength=n)
+    push_y += np.bincount(a, weights=fy, minlength=n) - np.bincount(b, weights=fy, minlength=n)
+    return push_x, push_y
@@ -1,32 +1,361 @@
 # enemy.py
 import pygame
 import math
+import numpy as np
 import app
+from entities import EntityContainer
+from crowd import separation
+
+# Per-enemy values that live in the enemy store arrays (struct-of-arrays)
+FLOAT_FIELDS = ("x", "y", "prev_x", "prev_y", "speed", "health", "max_health",
+                "knockback_dx", "knockback_dy", "knockback_dist_remaining")
+INT_FIELDS = ("animation_timer", "animation_speed", "frame_index", "frame_count", "lod_phase")
+BOOL_FIELDS = ("facing_left",)
+
+class EnemyRow:
+    # Holds the values of a single enemy that is not part of a store
+    # (created standalone, or removed from the store). Fields are 1-element
+    # lists so Enemy can index them exactly like the store arrays.
+    def __init__(self, values):
+        for name, value in values.items():
+            setattr(self, name, [value])
+
+class EnemyStore(EntityContainer):
+    # Keeps every live enemy's state in NumPy arrays so chase, knockback and
+    # animation run as one batched operation per tick. Enemy objects are thin
+    # views (store, slot) kept in self.views, where views[i].slot == i. Killed
+    # enemies are discard()ed by handle and leave the arrays at compact().
+    #
+    # Level of detail: given the view, update() only animates enemies on screen and
+    # only moves enemies near the view every tick. Enemies further out move on every
+    # LOD_FAR_INTERVAL-th tick (spread over the ticks by lod_phase) with a step that
+    # covers the skipped ticks, and go back to full updates once they come close.
+    # Near enemies are also pushed apart (separate()) so a horde reads as a crowd.
+    # Whatever moved an enemy, a move that would end inside a pillar is undone.
+    def __init__(self, capacity=256):
+        super().__init__()
+        self.capacity = capacity
+        self.views = []
+        self.ticks = 0  # update() calls, for the staggered far updates
+        self.near = np.zeros(0, dtype=bool)  # Enemies given a full update by the last update()
+        for name in FLOAT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.float64))
+        for name in INT_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=np.int64))
+        for name in BOOL_FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype=bool))
+
+    @property
+    def count(self):
+        return len(self.handles)
+
+    def fields(self):
+        return FLOAT_FIELDS + INT_FIELDS + BOOL_FIELDS
+
+    def grow(self): # Double the array capacity when full
+        new_capacity = self.capacity * 2
+        for name in self.fields():
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:self.capacity] = old
+            setattr(self, name, new)
+        self.capacity = new_capacity
+
+    def add(self, enemy, values): # Returns (handle, slot)
+        if self.count == self.capacity:
+            self.grow()
+        handle, slot = self._allocate()
+        for name, value in values.items():
+            getattr(self, name)[slot] = value
+        self.lod_phase[slot] = handle % app.LOD_FAR_INTERVAL
+        self.views.append(enemy)
+        return handle, slot
+
+    def row(self, slot): # Copy one enemy's values out as plain Python values
+        return {name: getattr(self, name)[slot].item() for name in self.fields()}
+
+    def _removing(self, slot): # The enemy keeps its last values after leaving the store
+        enemy = self.views[slot]
+        enemy.detach(EnemyRow(self.row(slot)))
+
+    def _move(self, src, dst):
+        for name in self.fields():
+            arr = getattr(self, name)
+            arr[dst] = arr[src]
+        moved = self.views[src]
+        moved.slot = dst
+        self.views[dst] = moved
+
+    def _pop(self):
+        self.views.pop()
+
+    def clear(self):
+        super().clear()
+        self.ticks = 0  # A new game staggers the same way as a fresh store
+
+    def __iter__(self):
+        return iter(self.views)
+
+    def __getitem__(self, index):
+        return self.views[index]
+
+    def __contains__(self, enemy): # Live and not waiting for removal
+        return getattr(enemy, "store", None) is self and enemy.handle not in self.pending
+
+    def copy(self):
+        return list(self.views)
+
+    def positions(self): # x and y arrays of every live enemy (for the spatial grid)
+        n = self.count
+        return self.x[:n], self.y[:n]
+
+    def in_rect(self, rect, margin=0): # Mask of the enemies whose center is inside rect grown by margin
+        x, y = self.positions()
+        return ((x >= rect.left - margin) & (x < rect.right + margin)
+                & (y >= rect.top - margin) & (y < rect.bottom + margin))
+
+    def near_positions(self, rects=()):
+        # (enemies, x, y) of the enemies given a full update by the last update(), plus
+        # the far ones inside any of rects
+        near = self.near[:self.count]
+        for rect in rects:
+            near = near | self.in_rect(rect)
+        index = np.flatnonzero(near)
+        views = self.views
+        return [views[i] for i in index.tolist()], self.x[index], self.y[index]
+
+    def store_previous_positions(self): # Start of a simulation step, for interpolated drawing
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+
+    def draw_positions(self, alpha=1.0): # Positions alpha of the way from the previous step to this one
+        n = self.count
+        x, y = self.x[:n], self.y[:n]
+        if alpha >= 1.0:
+            return x, y
+        prev_x, prev_y = self.prev_x[:n], self.prev_y[:n]
+        return prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha
+
+    def update(self, player, view=None, flow=None, obstacles=None):
+        # Batched equivalent of Enemy.update for every live enemy. view is the world rect
+        # on screen; without one every enemy gets a full update. flow is the FlowField
+        # that steers near enemies around pillars, and obstacles the ObstacleMap that
+        # keeps every enemy out of them.
+        n = self.count
+        if n == 0:
+            self.near = np.zeros(0, dtype=bool)
+            return
+        self.ticks += 1
+        x, y = self.x[:n], self.y[:n]
+        start_x, start_y = x.copy(), y.copy()
+        remaining = self.knockback_dist_remaining[:n]
+        facing_left = self.facing_left[:n]
+        if view is None:
+            near = on_screen = np.ones(n, dtype=bool)
+        else:
+            near = self.in_rect(view, app.LOD_NEAR_MARGIN)
+            on_screen = self.in_rect(view, app.CULL_MARGIN)
+
+        # Knockback for enemies that are still being pushed away
+        knocked = remaining > 0
+        if knocked.any():
+            step = np.minimum(app.ENEMY_KNOCKBACK_SPEED, remaining[knocked])
+            remaining[knocked] -= step
+            x[knocked] += self.knockback_dx[:n][knocked] * step
+            y[knocked] += self.knockback_dy[:n][knocked] * step
+            facing_left[knocked] = self.knockback_dx[:n][knocked] < 0
+
+        # Everyone else chases the player: near enemies every tick, far ones on their turn
+        far_turn = ~near & (self.lod_phase[:n] == self.ticks % app.LOD_FAR_INTERVAL)
+        chasing = np.flatnonzero(~knocked & (near | far_turn))
+        dx = player.x - x[chasing]
+        dy = player.y - y[chasing]
+        dist = np.hypot(dx, dy)
+        safe_dist = np.where(dist != 0, dist, 1.0)
+        step_x = np.where(dist != 0, dx / safe_dist, 0.0)
+        step_y = np.where(dist != 0, dy / safe_dist, 0.0)
+        steer = flow.sample(x[chasing], y[chasing]) if flow is not None else None
+        if steer is not None: # Near enemies with a pillar in the way follow the field instead
+            field_x, field_y, use = steer
+            use &= near[chasing]
+            step_x = np.where(use, field_x, step_x)
+            step_y = np.where(use, field_y, step_y)
+        speed = self.speed[:n][chasing] * np.where(near[chasing], 1, app.LOD_FAR_INTERVAL)
+        x[chasing] += step_x * speed
+        y[chasing] += step_y * speed
+        facing_left[chasing] = step_x < 0
+
+        self.separate(np.flatnonzero(near))
+        if obstacles is not None:
+            self.keep_out(obstacles, np.flatnonzero(knocked | near | far_turn), start_x, start_y, flow)
+        self.near = near
+        self.animate(np.flatnonzero(on_screen))  # Off-screen enemies keep their frame
+
+    def separate(self, index): # Spread the enemies at index into a crowd instead of one stack
+        if len(index) < 2:
+            return
+        x, y = self.x[index], self.y[index]
+        push_x, push_y = separation(x, y, app.SEPARATION_RADIUS, app.SEPARATION_MAX_PER_CELL)
+        push_x *= app.SEPARATION_STRENGTH
+        push_y *= app.SEPARATION_STRENGTH
+        length = np.hypot(push_x, push_y)
+        limit = np.minimum(1.0, app.SEPARATION_MAX_PUSH / np.maximum(length, 1e-9))
+        self.x[index] = x + push_x * limit
+        self.y[index] = y + push_y * limit
+
+    def keep_out(self, obstacles, index, old_x, old_y, flow=None):
+        # Undo the moves of the enemies at index that ended inside a pillar, one axis at a
+        # time so they slide along its side. Enemies that started inside one (spawned
+        # there) are left to walk out. When the flow field's window around the player has
+        # no pillars, the enemies that ended inside it are skipped without a lookup.
+        x, y = self.x[index], self.y[index]
+        if flow is not None and not flow.active:
+            outside = ~flow.open_at(x, y)
+            if not outside.any():
+                return
+            index, x, y = index[outside], x[outside], y[outside]
+        cell = obstacles.cell_size  # Pillars are whole cells: only a move into a new cell can enter one
+        crossed = ((np.floor_divide(x, cell) != np.floor_divide(old_x[index], cell))
+                   | (np.floor_divide(y, cell) != np.floor_divide(old_y[index], cell)))
+        index, x, y = index[crossed], x[crossed], y[crossed]
+        inside = obstacles.blocked(x, y)
+        if not inside.any():
+            return
+        index, x, y = index[inside], x[inside], y[inside]
+        ox, oy = old_x[index], old_y[index]
+        stuck = obstacles.blocked(ox, oy)
+        keep_x = ~obstacles.blocked(x, oy)  # The horizontal part of the move alone is clear
+        keep_y = ~keep_x & ~obstacles.blocked(ox, y)
+        self.x[index] = np.where(stuck | keep_x, x, ox)
+        self.y[index] = np.where(stuck | keep_y, y, oy)
+
+    def animate(self, index=None): # Advance the animation of the enemies at index (default: all)
+        n = self.count
+        if index is None:
+            index = np.arange(n)
+        timer = self.animation_timer[index] + 1
+        rolled = timer >= self.animation_speed[index]
+        timer[rolled] = 0
+        self.animation_timer[index] = timer
+        rolled_index = index[rolled]
+        self.frame_index[rolled_index] = (self.frame_index[rolled_index] + 1) % self.frame_count[rolled_index]
+
+    def visible(self, xs, ys, margin=app.CULL_MARGIN): # Indices of screen positions inside the screen
+        return np.flatnonzero((xs >= -margin) & (xs < app.WIDTH + margin)
+                              & (ys >= -margin) & (ys < app.HEIGHT + margin))
+
+    def submit(self, queue, layer="enemies", alpha=1.0, camera=(0, 0)):
+        # Queue every on-screen enemy sprite in one pass over the arrays; health bars are
+        # collected on the way and drawn by one callback on the health bar layer
+        n = self.count
+        if n == 0:
+            return
+        xs, ys = self.draw_positions(alpha)
+        xs = xs - camera[0]  # World to screen
+        ys = ys - camera[1]
+        shown = self.visible(xs, ys)  # Off-screen enemies are skipped entirely
+        views = self.views
+        sprites = []
+        bars = []
+        for i, x, y, left, index, health, max_health in zip(
+                shown.tolist(), xs[shown].tolist(), ys[shown].tolist(), self.facing_left[shown].tolist(),
+                self.frame_index[shown].tolist(), self.health[shown].tolist(), self.max_health[shown].tolist()):
+            enemy = views[i]
+            image = enemy.frames[left][index]
+            rect = image.get_rect(center=(x, y))
+            sprites.append((image, rect))
+            bars.append((enemy.health_bar_rect(rect), health / max_health))
+        queue.extend(layer, sprites)
+        queue.add_draw("health_bars", lambda surface: self.draw_health_bars(surface, bars))
+
+    def draw_health_bars(self, surface, bars):
+        draw_rect = pygame.draw.rect
+        for bar, ratio in bars:
+            draw_rect(surface, (255, 0, 0), bar)  # Background bar (red)
+            draw_rect(surface, (0, 255, 0), (bar.x, bar.y, int(bar.width * ratio), bar.height))  # Foreground bar (green)
+
+    def set_knockback_all(self, px, py, dist): # Batched Enemy.set_knockback for every live enemy
+        n = self.count
+        dx = self.x[:n] - px
+        dy = self.y[:n] - py
+        length = np.hypot(dx, dy)
+        pushed = length != 0
+        self.knockback_dx[:n][pushed] = dx[pushed] / length[pushed]
+        self.knockback_dy[:n][pushed] = dy[pushed] / length[pushed]
+        self.knockback_dist_remaining[:n][pushed] = dist
 
 class Enemy:
-    def __init__(self, x, y, enemy_type, enemy_assets, speed=app.DEFAULT_ENEMY_SPEED, level=1):
-        # Core position attributes
-        self.x = x  # X position in game world
-        self.y = y  # Y position in game world
-        self.speed = speed  # Movement speed
-        self.facing_left = False  # Direction enemy is facing
-        
+    def __init__(self, x, y, enemy_type, enemy_assets, speed=app.DEFAULT_ENEMY_SPEED, level=1, store=None):
         # Animation setup
-        self.frames = enemy_assets[enemy_type]  # List of sprite frames
-        self.frame_index = 0  # Current frame being shown
-        self.animation_timer = 0  # Time until next frame
-        self.animation_speed = 8  # Frames between animation updates
-        self.image = self.frames[self.frame_index]  # Current sprite
-        self.rect = self.image.get_rect(center=(self.x, self.y))  # Collision box
-        
+        self.frames = enemy_assets[enemy_type]  # (right-facing, left-facing) lists of sprite frames
+
         # Stats
-        self.max_health = int(12 * (1.15 ** (level - 1)))  # Health scales with level
-        self.health = self.max_health
+        max_health = int(12 * (1.15 ** (level - 1)))  # Health scales with level
         self.level = level
-        
-        # Knockback system
-        self.knockback_dist_remaining = 0  # Distance left to move when hit
-        self.knockback_dx = self.knockback_dy = 0  # Knockback direction 
+
+        values = {
+            "x": x, "y": y,  # Position in game world
+            "prev_x": x, "prev_y": y,  # Position at the start of the current step (for drawing)
+            "speed": speed,  # Movement speed
+            "health": max_health, "max_health": max_health,
+            # Knockback system: distance left to move when hit and its direction
+            "knockback_dx": 0, "knockback_dy": 0, "knockback_dist_remaining": 0,
+            "animation_timer": 0,  # Time until next frame
+            "animation_speed": 8,  # Frames between animation updates
+            "frame_index": 0,  # Current frame being shown
+            "frame_count": len(self.frames[0]),
+            "lod_phase": 0,  # Tick (mod LOD_FAR_INTERVAL) this enemy moves on while far away; set by the store
+            "facing_left": False,  # Direction enemy is facing
+        }
+
+        # Values live in the shared store when given one, otherwise in a private row
+        if store is None:
+            self.store = EnemyRow(values)
+            self.handle, self.slot = None, 0
+        else:
+            self.store = store
+            self.handle, self.slot = store.add(self, values)
+
+    def detach(self, row): # Called by the store when this enemy leaves it
+        self.store = row
+        self.handle, self.slot = None, 0
+
+    # Attribute views onto the store arrays
+    def _field(name):
+        def get(self):
+            return getattr(self.store, name)[self.slot]
+        def set(self, value):
+            getattr(self.store, name)[self.slot] = value
+        return property(get, set)
+
+    x = _field("x")
+    y = _field("y")
+    speed = _field("speed")
+    health = _field("health")
+    max_health = _field("max_health")
+    knockback_dx = _field("knockback_dx")
+    knockback_dy = _field("knockback_dy")
+    knockback_dist_remaining = _field("knockback_dist_remaining")
+    animation_timer = _field("animation_timer")
+    animation_speed = _field("animation_speed")
+    frame_index = _field("frame_index")
+    facing_left = _field("facing_left")
+    del _field
+
+    @property
+    def image(self): # Current sprite, already facing the right way
+        return self.frames[int(self.facing_left)][self.frame_index]
+
+    @property
+    def rect(self): # Collision box, derived from the stored position
+        rect = self.image.get_rect()
+        rect.center = (self.x, self.y)
+        return rect
+
+    def draw_rect(self): # Screen area covered by draw(): sprite plus health bar
+        rect = self.rect
+        return rect.union(self.health_bar_rect(rect))
 
     def update(self, player):
         # Handle movement (knockback or chase player)
@@ -44,16 +373,13 @@ class Enemy:
 
         # Update position if not at player
         if dist != 0:
-            self.x += (dx / dist) * self.speed  
-            self.y += (dy / dist) * self.speed 
+            self.x += (dx / dist) * self.speed
+            self.y += (dy / dist) * self.speed
 
 
         # Face the correct direction
         self.facing_left = dx < 0  # Face left if player is to the left
 
-        # Update collision box position
-        self.rect.center = (self.x, self.y)
-
     def apply_knockback(self):
         step = min(app.ENEMY_KNOCKBACK_SPEED, self.knockback_dist_remaining)
         self.knockback_dist_remaining -= step
@@ -66,41 +392,18 @@ class Enemy:
         else:
             self.facing_left = False
 
-        self.rect.center = (self.x, self.y)
-
     def animate(self):
         self.animation_timer += 1
         if self.animation_timer >= self.animation_speed:
             self.animation_timer = 0
-            self.frame_index = (self.frame_index + 1) % len(self.frames)
-            center = self.rect.center
-            self.image = self.frames[self.frame_index]
-            self.rect = self.image.get_rect()
-            self.rect.center = center
-
-    def draw(self, surface):
-        if self.facing_left:
-            flipped_image = pygame.transform.flip(self.image, True, False)
-            surface.blit(flipped_image, self.rect)
-        else:
-            surface.blit(self.image, self.rect)
+            self.frame_index = (self.frame_index + 1) % len(self.frames[0])
 
-        # Draw health bar
-        self.draw_health_bar(surface)
-
-    def draw_health_bar(self, surface):
+    def health_bar_rect(self, rect):
         bar_width = 40  # Fixed width for health bar
         bar_height = 5
-        health_ratio = self.health / self.max_health  # Use max_health instead of recalculating
-        health_bar_width = int(bar_width * health_ratio)
-
-        # Background bar (red)
-        bar_x = self.rect.centerx - bar_width // 2  # Center the bar
-        bar_y = self.rect.y - bar_height - 2
-        pygame.draw.rect(surface, (255, 0, 0), (bar_x, bar_y, bar_width, bar_height))
-
-        # Foreground bar (green)
-        pygame.draw.rect(surface, (0, 255, 0), (bar_x, bar_y, health_bar_width, bar_height))
+        bar_x = rect.centerx - bar_width // 2  # Center the bar
+        bar_y = rect.y - bar_height - 2
+        return pygame.Rect(bar_x, bar_y, bar_width, bar_height)
 
     def set_knockback(self, px, py, dist):
         dx = self.x - px
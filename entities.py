@@ -0,0 +1,101 @@
+# entities.py
+class EntityContainer:
+    # Dense storage for entities addressed by stable integer handles. Slots are kept
+    # packed (0..len-1); removal is deferred: discard() only marks a handle, and
+    # compact() swap-removes every marked slot at the end of the tick, so removing
+    # k entities costs O(k) instead of O(k * n).
+    # Subclasses keep their per-slot data in parallel lists/arrays and implement
+    # _move(src, dst) and _pop() (and optionally _removing(slot)); _pop() is called
+    # after the last handle has been dropped, so len(self) is the slot to free.
+    def __init__(self):
+        self.handles = []  # Handle stored in each slot
+        self.slot_of = {}  # handle -> current slot
+        self.pending = set()  # Handles waiting to be removed by compact()
+        self.next_handle = 1
+
+    def _allocate(self): # Reserve the next slot, returning (handle, slot)
+        handle = self.next_handle
+        self.next_handle += 1
+        slot = len(self.handles)
+        self.handles.append(handle)
+        self.slot_of[handle] = slot
+        return handle, slot
+
+    def discard(self, handle): # Mark for removal at the next compact()
+        if handle in self.slot_of:
+            self.pending.add(handle)
+
+    def alive(self, handle):
+        return handle in self.slot_of and handle not in self.pending
+
+    def slot(self, handle):
+        return self.slot_of[handle]
+
+    def compact(self): # Swap-remove every pending handle
+        if not self.pending:
+            return
+        handles = self.handles
+        slot_of = self.slot_of
+        for handle in self.pending:
+            slot = slot_of.pop(handle)
+            self._removing(slot)
+            last = len(handles) - 1
+            if slot != last: # The last entity takes over the freed slot
+                self._move(last, slot)
+                moved = handles[last]
+                handles[slot] = moved
+                slot_of[moved] = slot
+            handles.pop()
+            self._pop()
+        self.pending.clear()
+
+    def clear(self):
+        handles = self.handles
+        while handles:
+            self._removing(len(handles) - 1)
+            handles.pop()
+            self._pop()
+        self.slot_of.clear()
+        self.pending.clear()
+
+    def __len__(self):
+        return len(self.handles)
+
+    def _removing(self, slot):
+        pass
+
+    def _move(self, src, dst):
+        raise NotImplementedError
+
+    def _pop(self):
+        raise NotImplementedError
+
+class EntityList(EntityContainer):
+    # EntityContainer of plain objects; each object gets its handle as obj.handle
+    def __init__(self):
+        super().__init__()
+        self.items = []
+
+    def add(self, item):
+        handle, slot = self._allocate()
+        item.handle = handle
+        self.items.append(item)
+        return handle
+
+    def get(self, handle):
+        return self.items[self.slot_of[handle]]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    def __contains__(self, item):
+        return self.alive(getattr(item, "handle", None))
+
+    def _move(self, src, dst):
+        self.items[dst] = self.items[src]
+
+    def _pop(self):
+        self.items.pop()
@@ -0,0 +1,65 @@
+# floor.py
+import random
+from collections import OrderedDict
+
+import pygame
+import app
+
+class FloorChunks:
+    # The world floor, cut into square chunks of tiles. A chunk is only rendered when
+    # it first comes into view, and the tiles in it are picked by a generator seeded
+    # from the chunk coordinate, so a chunk that was dropped from the cache comes back
+    # exactly the same. Only the most recently seen chunks are kept, so memory stays
+    # flat however far the player walks. Pillars from the obstacle map are painted in.
+    def __init__(self, tiles, seed=0, obstacles=None, chunk_tiles=app.FLOOR_CHUNK_TILES,
+                 max_chunks=app.FLOOR_CHUNK_CACHE):
+        self.tiles = tiles
+        self.seed = seed
+        self.obstacles = obstacles
+        self.tile_w = tiles[0].get_width()
+        self.tile_h = tiles[0].get_height()
+        self.chunk_tiles = chunk_tiles
+        self.chunk_w = self.tile_w * chunk_tiles
+        self.chunk_h = self.tile_h * chunk_tiles
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> surface, least recently used first
+        self.generated = 0  # Chunks rendered so far (evicted chunks count again when they come back)
+
+    def render_chunk(self, cx, cy):
+        rng = random.Random(f"{self.seed}:{cx}:{cy}")  # Same chunk, same tiles
+        chunk = pygame.Surface((self.chunk_w, self.chunk_h)).convert()
+        tiles = self.tiles
+        for ty in range(self.chunk_tiles):
+            for tx in range(self.chunk_tiles):
+                chunk.blit(rng.choice(tiles), (tx * self.tile_w, ty * self.tile_h))
+        if self.obstacles is not None:
+            self.obstacles.draw(chunk, cx * self.chunk_w, cy * self.chunk_h)
+        self.generated += 1
+        return chunk
+
+    def get_chunk(self, cx, cy):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.render_chunk(cx, cy)
+            self.chunks[key] = chunk
+            if len(self.chunks) > self.max_chunks:
+                self.chunks.popitem(last=False)  # Evict the least recently used
+        else:
+            self.chunks.move_to_end(key)
+        return chunk
+
+    def chunk_range(self, rect): # Chunk coordinates overlapping a world rect
+        return (range(rect.left // self.chunk_w, (rect.right - 1) // self.chunk_w + 1),
+                range(rect.top // self.chunk_h, (rect.bottom - 1) // self.chunk_h + 1))
+
+    def warm(self, rect): # Render the chunks under a world rect ahead of time
+        xs, ys = self.chunk_range(rect)
+        for cy in ys:
+            for cx in xs:
+                self.get_chunk(cx, cy)
+
+    def draw(self, surface, left, top): # Floor of the world area whose top-left corner is (left, top)
+        xs, ys = self.chunk_range(pygame.Rect(left, top, surface.get_width(), surface.get_height()))
+        surface.blits([(self.get_chunk(cx, cy), (cx * self.chunk_w - left, cy * self.chunk_h - top))
+                       for cy in ys for cx in xs], False)
@@ -0,0 +1,130 @@
+# flow_field.py
+import numpy as np
+import app
+
+# Neighbour steps (dx, dy) and their unit vectors; diagonals come last
+STEPS = ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (1, -1), (-1, 1), (-1, -1))
+STEP_X = np.array([dx for dx, dy in STEPS], dtype=np.float64)
+STEP_Y = np.array([dy for dx, dy in STEPS], dtype=np.float64)
+STEP_LENGTH = np.hypot(STEP_X, STEP_Y)
+UNIT_X, UNIT_Y = STEP_X / STEP_LENGTH, STEP_Y / STEP_LENGTH
+# Step closest to a direction, by angle in 45 degree sectors (atan2 order: E, SE, S, SW, W, NW, N, NE)
+SECTOR_STEP = np.array([STEPS.index(step) for step in
+                        ((1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1))])
+
+def shift(a, dx, dy, fill):
+    # Copy of a moved by (dx, dy) cells: result[y, x] = a[y - dy, x - dx]
+    out = np.full_like(a, fill)
+    h, w = a.shape
+    out[max(dy, 0):h + min(dy, 0), max(dx, 0):w + min(dx, 0)] = a[max(-dy, 0):h + min(-dy, 0), max(-dx, 0):w + min(-dx, 0)]
+    return out
+
+class FlowField:
+    # Shared route to the player for the whole horde. The cells in a window around the
+    # player get their step distance to the player's cell from one breadth-first search
+    # (run as a NumPy wavefront, no diagonal corner cutting), and every cell stores
+    # which way to go. Enemies only look up their cell, so pathing costs the same for
+    # ten enemies or ten thousand. The search is redone when the player changes cell.
+    #
+    # Where heading straight for the player already makes progress the cell says so and
+    # the enemy keeps its exact straight-line chase; only cells where a pillar is in the
+    # way get a field direction. With no pillars in the window nothing is computed.
+    def __init__(self, obstacles, half_width=None, half_height=None):
+        self.obstacles = obstacles
+        self.cell_size = obstacles.cell_size
+        # Window reach in cells: enough to cover every enemy that gets full updates
+        margin = app.WIDTH // 2 + app.LOD_NEAR_MARGIN, app.HEIGHT // 2 + app.LOD_NEAR_MARGIN
+        self.half_width = half_width if half_width is not None else margin[0] // self.cell_size + 1
+        self.half_height = half_height if half_height is not None else margin[1] // self.cell_size + 1
+        self.target = None  # Player cell the field was built for
+        self.origin = (0, 0)  # World cell of the window's top-left cell
+        self.active = False  # False when the window has no pillars (straight-line chase everywhere)
+        self.dist = None  # Steps to the target per cell, -1 where it cannot be reached
+        self.straight = None  # True where the straight line to the target is a shortest-path step
+        self.dir_x = None
+        self.dir_y = None
+        self.builds = 0  # Searches run so far
+
+    def update(self, x, y): # Target the player at (x, y); rebuilds only when it changed cell
+        target = (int(x // self.cell_size), int(y // self.cell_size))
+        if target == self.target:
+            return
+        self.target = target
+        ox, oy = target[0] - self.half_width, target[1] - self.half_height
+        self.origin = (ox, oy)
+        walk = self.obstacles.walkable(ox, oy, 2 * self.half_width + 1, 2 * self.half_height + 1)
+        self.active = not walk.all()
+        if self.active:
+            self.build(walk)
+
+    def build(self, walk):
+        self.builds += 1
+        tx, ty = self.half_width, self.half_height
+        dist = np.full(walk.shape, -1, dtype=np.int32)
+        walk = walk.copy()
+        walk[ty, tx] = True  # The player's own cell is always the goal
+        dist[ty, tx] = 0
+
+        # A diagonal step is only allowed when both cells beside it are open
+        diagonal_ok = {}
+        for dx, dy in STEPS[4:]:
+            diagonal_ok[dx, dy] = shift(walk, -dx, 0, False) & shift(walk, 0, -dy, False)
+
+        # Breadth-first search from the target, one ring of cells per iteration
+        frontier = dist == 0
+        step = 0
+        while frontier.any():
+            step += 1
+            reached = np.zeros_like(frontier)
+            for dx, dy in STEPS:
+                source = frontier if dx == 0 or dy == 0 else frontier & diagonal_ok[dx, dy]
+                reached |= shift(source, dx, dy, False)
+            frontier = reached & walk & (dist < 0)
+            dist[frontier] = step
+
+        # Per cell, the neighbours that are one step closer to the target
+        h, w = dist.shape
+        descent = np.zeros((len(STEPS), h, w), dtype=bool)
+        for k, (dx, dy) in enumerate(STEPS):
+            closer = (shift(dist, -dx, -dy, -1) == dist - 1) & (dist > 0)
+            if dx != 0 and dy != 0:
+                closer &= diagonal_ok[dx, dy]
+            descent[k] = closer
+
+        # Straight line from each cell center to the target, and the step nearest to it
+        cols, rows = np.meshgrid(np.arange(w), np.arange(h))
+        to_x, to_y = (tx - cols).astype(np.float64), (ty - rows).astype(np.float64)
+        sector = np.round(np.arctan2(to_y, to_x) / (np.pi / 4)).astype(np.int64) % 8
+        straight_step = SECTOR_STEP[sector]
+        straight = np.take_along_axis(descent, straight_step[None], axis=0)[0]
+
+        # Otherwise the descending step that bends least away from the straight line
+        score = np.where(descent, UNIT_X[:, None, None] * to_x + UNIT_Y[:, None, None] * to_y, -np.inf)
+        best = score.argmax(axis=0)
+        has_step = descent.any(axis=0)
+        self.dist = dist
+        self.straight = straight | ~has_step  # Unreachable cells (and the target) chase in a straight line
+        self.dir_x = np.where(has_step, UNIT_X[best], 0.0)
+        self.dir_y = np.where(has_step, UNIT_Y[best], 0.0)
+
+    def open_at(self, xs, ys): # Mask of the world positions inside a window that has no pillars
+        if self.active or self.target is None:
+            return np.zeros(len(xs), dtype=bool)
+        cx = np.floor_divide(xs, self.cell_size) - self.origin[0]
+        cy = np.floor_divide(ys, self.cell_size) - self.origin[1]
+        return ((cx >= 0) & (cx <= 2 * self.half_width)
+                & (cy >= 0) & (cy <= 2 * self.half_height))
+
+    def sample(self, xs, ys):
+        # Field directions at world positions: (dir_x, dir_y, use) where use marks the
+        # positions that should follow the field instead of chasing in a straight line
+        if not self.active:
+            return None
+        cx = np.floor_divide(xs, self.cell_size).astype(np.int64) - self.origin[0]
+        cy = np.floor_divide(ys, self.cell_size).astype(np.int64) - self.origin[1]
+        h, w = self.dist.shape
+        inside = (cx >= 0) & (cx < w) & (cy >= 0) & (cy < h)
+        cx = np.where(inside, cx, 0)
+        cy = np.where(inside, cy, 0)
+        use = inside & ~self.straight[cy, cx]
+        return self.dir_x[cy, cx], self.dir_y[cy, cx], use
@@ -2,104 +2,276 @@
 import pygame
 import random
 import os
+import time
 
 import app
 
 from player import Player
-from enemy import Enemy
-from coin import Coin
-import math
+from enemy import Enemy, EnemyStore
+from coin import CoinField
+from spatial_grid import SpatialGrid
+from profiler import FrameProfiler
+from text_cache import TextCache
+from renderer import DirtyRectRenderer
+from render_queue import RenderQueue
+from sound import SoundManager
+from boot import BootLoader
+from camera import Camera, view_rect
+from floor import FloorChunks
+from obstacles import ObstacleMap
+from flow_field import FlowField
+from replay import InputRecorder, InputReplay, EVENT_CLICK, EVENT_UPGRADE, EVENT_LEVEL_UP
+
+SPAWN_OUTWARD = {"top": (0, -1), "bottom": (0, 1), "left": (-1, 0), "right": (1, 0)}  # Away from the view
 
 class Game:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()  # Initialize the mixer for sound
-        self.screen = pygame.display.set_mode((app.WIDTH, app.HEIGHT))
+    def __init__(self, headless=False, seed=None, weapon=None, max_ticks=None, profile=False, profile_csv=None,
+                 dirty_rects=False, render_fps=app.FPS, record=None, replay=None):
+        # Headless mode runs the simulation without a window or audio device and without
+        # frame pacing, so it can run faster than real time (soak tests, benchmarks)
+        self.boot = BootLoader()  # Boot stages and background loads, with a timeline
+        self.headless = headless
+        self.max_ticks = max_ticks  # Stop after this many updates (None = play until quit)
+        self.ticks = 0
+        if headless:
+            os.environ["SDL_VIDEODRIVER"] = "dummy"
+            os.environ["SDL_AUDIODRIVER"] = "dummy"
+        # Input recording / replay (paths). A replay brings its own seed and weapon; a recording
+        # needs a known seed, so it picks one when none is given
+        self.replay = InputReplay.load(replay) if replay is not None else None
+        self.recorder = None
+        if self.replay is not None:
+            seed, weapon = self.replay.seed, self.replay.weapon
+        elif record is not None:
+            if seed is None:
+                seed = random.randrange(2 ** 32)
+            self.recorder = InputRecorder(record, seed)
+        if seed is not None: # Every random call in the game goes through the global generator
+            random.seed(seed)
+        # ...except the headless upgrade picks, which a replay reads from its events instead
+        # of drawing, so they must not move the global generator
+        self.upgrade_rng = random.Random(seed)
+
+        # Only what the weapon selection screen needs happens before its first frame:
+        # pygame, the window and the fonts. Sprites, the floor and sounds load on the
+        # boot thread and are waited for when first used (see the properties below).
+        self.boot.stage("pygame.init", self.init_pygame)
+        self.screen = self.boot.stage("display", pygame.display.set_mode, (app.WIDTH, app.HEIGHT))
         pygame.display.set_caption("Shooter")
+        self.boot.submit("assets", app.load_assets)
+        floor_seed = random.getrandbits(32)  # Drawn here: the boot thread must not touch the global generator
+        self.boot.submit("floor", self.create_floor, floor_seed)
+        self.obstacles = ObstacleMap(floor_seed)  # Pillars, the same ones the floor paints
+        self.flow_field = FlowField(self.obstacles)  # Shared route to the player around them
+        self.boot.submit("sounds", SoundManager)  # Loaded once, played through reserved channels with per-frame limits
         self.clock = pygame.time.Clock()
+        self.render_fps = render_fps  # Render frame cap (0 = uncapped); the simulation always steps at app.TICK_RATE
         self.in_level_up_menu = False
         self.upgrade_options = []
 
-        self.assets = app.load_assets()
-
         font_path = os.path.join("assets", "PressStart2P.ttf")
-        self.font_small = pygame.font.Font(font_path, 18)
-        self.font_large = pygame.font.Font(font_path, 32)
-
-        self.background = self.create_random_background(
-            app.WIDTH, app.HEIGHT, self.assets["floor_tiles"]
-        )
+        self.font_small, self.font_large = self.boot.stage(
+            "fonts", lambda: (pygame.font.Font(font_path, 18), pygame.font.Font(font_path, 32)))
+        self.text = TextCache()  # All HUD and menu text goes through this cache
+        self.render_queue = RenderQueue()  # World sprites are collected here and blitted per layer
+
+        # The camera follows the player around the world; the floor under it is redrawn
+        # into view_background only when it moves
+        self.camera = Camera()
+        self.view_background = None
+        self.view_origin = None  # Camera position view_background was drawn for
+
+        # Optional dirty-rect renderer for low-power machines (otherwise full flips); made on
+        # the first game frame, once the floor exists
+        self.dirty_rects = dirty_rects
+        self.renderer = None
 
         self.running = True
         self.game_over = False
 
-        self.enemies = []  # List to store enemies
+        self.enemies = EnemyStore()  # Array-backed store of live enemies
+        self.enemy_grid = SpatialGrid(app.ENEMY_GRID_CELL_SIZE)  # Spatial index over enemies, rebuilt every tick
         self.enemy_spawn_timer = 0
         self.enemy_spawn_interval = 30 
         self.enemies_per_spawn = 2
 
-        self.coins = []
-        self.weapon_choice = None  # Initialize weapon choice before calling reset_game
-        self.reset_game()
-
-        # Load sound effects
-        self.sounds = {
-            "shoot": pygame.mixer.Sound(os.path.join("assets", "shoot.wav")),
-            "enemy_death": pygame.mixer.Sound(os.path.join("assets", "enemy_death.wav")),
-            "level_up": pygame.mixer.Sound(os.path.join("assets", "level_up.wav")),
-            "game_over": pygame.mixer.Sound(os.path.join("assets", "death.wav")),
-            "lightning": pygame.mixer.Sound(os.path.join("assets", "lightning.wav")),
-        }
-        self.sounds["shoot"].set_volume(0.5)  # Adjust volume (optional)
-        self.sounds["enemy_death"].set_volume(0.5)
-        self.sounds["level_up"].set_volume(0.7)
-        self.sounds["game_over"].set_volume(0.7)  
-        self.sounds["lightning"].set_volume(0.4)  # Lower volume for lightning
-        self.weapon_choice = None  # Store the player's weapon choice
+        self.input_source = None  # Optional callable(game) returning the pressed keys instead of the keyboard
+        self.coins = CoinField()  # Dropped coins, merged into stacks so the count stays bounded
+
+        # Order of the work done by update(), one entry per phase
+        self.update_phases = [
+            ("begin_step", self.begin_step),
+            ("player", self.update_player),
+            ("enemies", self.update_enemies),
+            ("weapon_collisions", self.check_weapon_collisions),
+            ("player_enemy_collisions", self.check_player_enemy_collisions),
+            ("bullet_collisions", self.check_bullet_enemy_collisions),
+            ("coin_collisions", self.check_player_coin_collisions),
+            ("compact", self.compact_entities),  # Apply this tick's removals (must follow every phase that removes)
+            ("player_death", self.check_player_death),
+            ("spawn", self.spawn_enemies),
+            ("level_up", self.check_for_level_up),
+        ]
+
+        self.weapon_choice = weapon  # A fixed weapon skips the selection screen
+        self.player = None
+        self.kills = 0
+        if self.weapon_choice is not None: # Otherwise the game starts once a weapon is picked
+            self.reset_game()
+
+        # Frame profiler (toggle with F3); only costs anything while enabled
+        self.profiler = FrameProfiler(csv_path=profile_csv)
+        if profile or profile_csv:
+            self.profiler.enable(self)
+
+
+    @property
+    def assets(self): # Sprites from the boot thread; the first use waits for them
+        return self.boot.wait("assets")
+
+    @property
+    def floor(self):
+        return self.boot.wait("floor")
+
+    @property
+    def sounds(self):
+        return self.boot.wait("sounds")
+
+    def init_pygame(self):
+        pygame.init()
+        try:
+            pygame.mixer.init()  # Initialize the mixer for sound
+        except pygame.error: # No audio device: the sound manager stays silent
+            pass
 
     def reset_game(self):
         if self.game_over:  # If resetting after death, clear weapon choice
             self.weapon_choice = None
-        self.player = Player(app.WIDTH // 2, app.HEIGHT // 2, self.assets, self.weapon_choice)  
-        self.enemies = [] 
+        if self.recorder is not None and self.recorder.started: # Only the first game is recorded
+            self.finish_recording()
+        if self.weapon_choice is not None:
+            # A recorded game starts from its seed, whatever ran before it (menus, the floor seed)
+            if self.recorder is not None:
+                self.recorder.start(self.weapon_choice, self.headless, self.ticks)
+                random.seed(self.recorder.seed)
+            elif self.replay is not None:
+                self.replay.start(self.ticks)
+                random.seed(self.replay.seed)
+        self.player = Player(app.WORLD_WIDTH // 2, app.WORLD_HEIGHT // 2, self.assets, self.weapon_choice, self.sounds)
+        self.enemies.clear()
+        self.enemy_grid.clear()
+        self.player.enemy_grid = self.enemy_grid
+        self.player.obstacles = self.obstacles
+        self.player.autofire = self.headless  # Nobody holds spacebar in headless mode
+        if self.replay is not None:
+            self.player.autofire = self.replay.autofire
+            self.input_source = self.replay.keys
         self.enemy_spawn_timer = 0
         self.enemies_per_spawn = 1
-        self.coins = []
+        self.coins.clear()
+        self.kills = 0
         self.game_over = False
+        if self.renderer is not None: # Everything on screen changes
+            self.renderer.invalidate()
 
-    def create_random_background(self, width, height, floor_tiles): 
-        bg = pygame.Surface((width, height))  
-        tile_w = floor_tiles[0].get_width()
-        tile_h = floor_tiles[0].get_height()  
-
-        for y in range(0, height, tile_h):
-            for x in range(0, width, tile_w):
-                tile = random.choice(floor_tiles)
-                bg.blit(tile, (x, y))
-
-        return bg
+    def create_floor(self, seed): # Boot stage: the floor, with the chunks around the start already drawn
+        # Its own obstacle map (same seed, same pillars) so the boot thread never shares one with the game
+        floor = FloorChunks(self.boot.wait("assets")["floor_tiles"], seed, ObstacleMap(seed))
+        floor.warm(view_rect(app.WORLD_WIDTH // 2, app.WORLD_HEIGHT // 2))
+        return floor
 
     def run(self):
+        if self.headless:
+            self.run_headless()
+            return
+
+        # Fixed-timestep loop: real time since the last frame is banked in an accumulator
+        # and spent in whole simulation steps, so game speed does not depend on render speed.
+        # Drawing is interpolated by the fraction of a step left in the accumulator.
+        step = 1.0 / app.TICK_RATE
+        accumulator = 0.0
+        last_time = time.perf_counter()
         while self.running:
             if self.weapon_choice is None:
                 self.show_weapon_selection_screen() # if no weapon yet, show the selection screen
+                last_time = time.perf_counter()  # Time spent choosing does not count
             else:
-                self.clock.tick(app.FPS) # Limit FPS
+                self.clock.tick(self.render_fps) # Limit FPS (0 = as fast as possible)
+                now = time.perf_counter()
+                accumulator += now - last_time
+                last_time = now
                 self.handle_events()
-
-                if not self.game_over and not self.in_level_up_menu: # Update game state only if not in level up menu
+                if self.replay is not None: # Upgrade picks recorded while the game was paused
+                    self.replay.apply_events(self)
+
+                steps = 0
+                while accumulator >= step and steps < app.MAX_STEPS_PER_FRAME:
+                    if self.replay is not None and not self.step_replay():
+                        break
+                    if self.game_over or self.in_level_up_menu: # Update game state only if not in level up menu
+                        accumulator = 0.0
+                        break
                     self.update()
+                    self.ticks += 1
+                    accumulator -= step
+                    steps += 1
+                    if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                        self.running = False
+                        break
+                if steps == app.MAX_STEPS_PER_FRAME: # Too far behind: drop the backlog
+                    accumulator %= step
 
-                self.draw()
+                if self.game_over or self.in_level_up_menu: # Paused: show the last step as is
+                    accumulator = 0.0
+                    self.draw()
+                else:
+                    self.draw(accumulator / step)
+                self.profiler.end_frame(self)
 
+        self.finish_recording()
+        self.profiler.disable(self)
+        self.boot.shutdown()
         pygame.quit()
 
+    def run_headless(self): # Uncapped simulation loop: no frame pacing and no drawing
+        if self.weapon_choice is None:
+            raise ValueError("headless mode needs a fixed weapon choice")
+        while self.running and not self.game_over:
+            if self.max_ticks is not None and self.ticks >= self.max_ticks:
+                break
+            self.handle_events()
+            if self.replay is not None:
+                if not self.step_replay():
+                    break
+            elif self.in_level_up_menu: # Nobody to press 1-3, so pick an upgrade at random
+                self.choose_upgrade(self.upgrade_rng.randrange(len(self.upgrade_options)))
+            self.update()
+            self.ticks += 1
+            self.profiler.end_frame(self)
+
+        self.finish_recording()
+        self.profiler.disable(self)
+        self.boot.shutdown()
+        pygame.quit()
+
+    def step_replay(self): # Apply recorded inputs for the next tick; False once the replay is over
+        self.replay.apply_events(self)
+        if self.replay.finished(self):
+            self.running = False
+            return False
+        return True
+
+    def finish_recording(self):
+        if self.recorder is not None and self.recorder.started:
+            self.recorder.save()
+        self.recorder = None
+
     def show_weapon_selection_screen(self):
         while self.weapon_choice is None:  # Keep showing screen until weapon is chosen
             self.screen.fill((0, 0, 0))
 
             # Title
-            title_surf = self.font_large.render("Choose Your Weapon!", True, (255, 255, 0))
+            title_surf = self.text.render(self.font_large, "Choose Your Weapon!", (255, 255, 0))
             title_rect = title_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 3 - 50))
             self.screen.blit(title_surf, title_rect)
 
@@ -107,9 +279,9 @@ class Game:
             bullet_text = "1. Bullet - Shoot with mouse/spacebar"
             sawblade_text = "2. Sawblade - Control with WASD"
             lightning_text = "3. Lightning Staff - Chain lightning between enemies"
-            bullet_surf = self.font_small.render(bullet_text, True, (255, 255, 255)) 
-            sawblade_surf = self.font_small.render(sawblade_text, True, (255, 255, 255))
-            lightning_surf = self.font_small.render(lightning_text, True, (255, 255, 255))
+            bullet_surf = self.text.render(self.font_small, bullet_text, (255, 255, 255)) 
+            sawblade_surf = self.text.render(self.font_small, sawblade_text, (255, 255, 255))
+            lightning_surf = self.text.render(self.font_small, lightning_text, (255, 255, 255))
             bullet_rect = bullet_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 - 40))
             sawblade_rect = sawblade_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2))
             lightning_rect = lightning_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 + 40))
@@ -118,6 +290,7 @@ class Game:
             self.screen.blit(lightning_surf, lightning_rect)
 
             pygame.display.flip()
+            self.boot.first_frame()
 
             for event in pygame.event.get(): # Handle events
                 if event.type == pygame.QUIT:
@@ -139,6 +312,11 @@ class Game:
         for event in pygame.event.get(): # if event is quit, exit the game
             if event.type == pygame.QUIT:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3: # Toggle the frame profiler
+                self.profiler.toggle(self)
+            elif self.replay is not None: # Replays take game input from the recording only
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    self.running = False
             elif event.type == pygame.KEYDOWN: # Check for key presses
                 if self.game_over:
                     if event.key == pygame.K_r:
@@ -147,133 +325,233 @@ class Game:
                         self.running = False
                 elif self.in_level_up_menu:  # only runs in the upgrade menu
                     if event.key in [pygame.K_1, pygame.K_2, pygame.K_3]:# Check for number keys for upgrades
-                        index = event.key - pygame.K_1  
-                        if 0 <= index < len(self.upgrade_options):
-                            upgrade = self.upgrade_options[index]
-                            self.apply_upgrade(self.player, upgrade)
-                            self.in_level_up_menu = False
+                        self.choose_upgrade(event.key - pygame.K_1)
                 elif event.key == pygame.K_l and not self.game_over:  # Debug: Press L to level up
-                    self.player.xp = self.player.level * self.player.level * 5  # Set XP to trigger level up
-                    self.check_for_level_up()
+                    self.debug_level_up()
             elif event.type == pygame.MOUSEBUTTONDOWN: # Check for mouse button presses to shoot
                 if self.weapon_choice == "bullet" and event.button == 1:  # Left mouse button
-                    self.player.shoot_toward_mouse(event.pos)  # Shoot bullets
-                    self.sounds["shoot"].play()
+                    self.click(self.camera.to_world(event.pos))
+
+    # Game input handled between ticks. These are also what a replay calls, and each one
+    # is logged when recording.
+
+    def choose_upgrade(self, index):
+        if 0 <= index < len(self.upgrade_options):
+            if self.recorder is not None:
+                self.recorder.record_event(self.ticks, EVENT_UPGRADE, index)
+            upgrade = self.upgrade_options[index]
+            self.apply_upgrade(self.player, upgrade)
+            self.in_level_up_menu = False
+
+    def debug_level_up(self):
+        if self.recorder is not None:
+            self.recorder.record_event(self.ticks, EVENT_LEVEL_UP)
+        self.player.xp = self.player.level * self.player.level * 5  # Set XP to trigger level up
+        self.check_for_level_up()
+
+    def click(self, pos): # pos is in world coordinates
+        if self.recorder is not None:
+            self.recorder.record_event(self.ticks, EVENT_CLICK, pos[0], pos[1])
+        self.player.shoot_toward_mouse(pos)  # Shoot bullets
+        self.sounds.play("shoot")
 
             
-    def spawn_enemies(self): # Spawn enemies at random positions
+    def spawn_enemies(self): # Spawn enemies at random positions just outside the view
         self.enemy_spawn_timer += 1
         if self.enemy_spawn_timer >= self.enemy_spawn_interval:
             self.enemy_spawn_timer = 0
+            # The view around the player's stepped position, so spawns do not depend on drawing
+            view = view_rect(self.player.x, self.player.y)
 
             for _ in range(self.enemies_per_spawn):  # Spawn multiple enemies
                 side = random.choice(["top", "bottom", "left", "right"])
                 # Randomly choose a side to spawn the enemy
                 if side == "top": 
-                    x = random.randint(0, app.WIDTH)
-                    y = -app.SPAWN_MARGIN
+                    x = random.randint(view.left, view.right)
+                    y = view.top - app.SPAWN_MARGIN
                 elif side == "bottom":
-                    x = random.randint(0, app.WIDTH)
-                    y = app.HEIGHT + app.SPAWN_MARGIN
+                    x = random.randint(view.left, view.right)
+                    y = view.bottom + app.SPAWN_MARGIN
                 elif side == "left":
-                    x = -app.SPAWN_MARGIN
-                    y = random.randint(0, app.HEIGHT)
+                    x = view.left - app.SPAWN_MARGIN
+                    y = random.randint(view.top, view.bottom)
                 else:
-                    x = app.WIDTH + app.SPAWN_MARGIN
-                    y = random.randint(0, app.HEIGHT)
+                    x = view.right + app.SPAWN_MARGIN
+                    y = random.randint(view.top, view.bottom)
+                # A spawn point inside a pillar moves further out until it is clear
+                out_x, out_y = SPAWN_OUTWARD[side]
+                while self.obstacles.collides(pygame.Rect(x, y, 1, 1)):
+                    x += out_x * app.FLOW_CELL_SIZE
+                    y += out_y * app.FLOW_CELL_SIZE
                 enemy_type = random.choice(list(self.assets["enemies"].keys())) # Randomly select enemy type
-                print(f"Enemy type: {enemy_type}") # Debugging line
-                enemy = Enemy(x, y, enemy_type, self.assets["enemies"], level=self.player.level) # Create enemy instance
-                self.enemies.append(enemy)
+                enemy = Enemy(x, y, enemy_type, self.assets["enemies"], level=self.player.level,
+                              store=self.enemies) # Create enemy instance inside the store
+                self.enemy_grid.insert(enemy)
             
-    def update(self): # Update game state
-        #execute player actions and other game events
+    def update(self): # Update game state (one fixed simulation step)
+        # Each phase runs in order; phases are named so benchmarks/profilers can time them
+        for name, phase in self.update_phases:
+            phase()
+            if self.game_over:
+                return
+
+    def begin_step(self): # Start-of-step bookkeeping, the first update phase
+        self.sounds.begin_frame()  # Per-frame sound limits start over
+        self.player.store_previous_positions()  # For interpolated drawing
+        self.enemies.store_previous_positions()
+
+    def update_player(self): #execute player actions and other game events
         self.player.enemies = self.enemies
-        self.player.handle_input()
+        keys = self.input_source(self) if self.input_source is not None else pygame.key.get_pressed()
+        if self.recorder is not None and self.recorder.started:
+            self.recorder.record_keys(keys)
+        self.player.handle_input(keys)
         self.player.update()
 
+    def update_enemies(self):
+        # Chase, knockback and animation for every enemy at once, in full detail near the
+        # view (the player's stepped position, so drawing never changes the simulation).
+        # The flow field is only searched again when the player moved to another cell.
+        self.flow_field.update(self.player.x, self.player.y)
+        self.enemies.update(self.player, view_rect(self.player.x, self.player.y), self.flow_field, self.obstacles)
+        # All proximity/collision queries below go through the grid. Bullets and the player
+        # stay near the view, so far enemies are left out of it unless the weapon can reach
+        # them from elsewhere (mini-staffs stay where they were dropped, orbiting sawblades
+        # swing out past the view).
+        self.enemy_grid.rebuild(*self.enemies.near_positions(self.player.reach_rects()))
+
+    def check_weapon_collisions(self):
         # Move enemies to a list to be removed to avoid modifying list while iterating
         enemies_to_remove = []
         
         if self.weapon_choice == "sawblade": # Check for sawblade collisions when sawblade is selected
             for sawblade in self.player.sawblades:
-                collided_enemies = sawblade.check_collision(self.enemies)
+                collided_enemies = sawblade.check_collision(self.enemies, self.enemy_grid)
                 enemies_to_remove.extend(collided_enemies)
         elif self.weapon_choice == "lightning": #check for lightning staff collisions when selected
-            killed_enemies = self.player.lightning_staff.check_collision(self.enemies)
+            killed_enemies = self.player.lightning_staff.check_collision(self.enemies, self.enemy_grid)  # Main and mini staffs share the tick's grid
             if killed_enemies:
-                self.sounds["lightning"].play()
+                self.sounds.play("lightning")
             enemies_to_remove.extend(killed_enemies)
         
         # Remove dead enemies and spawn coins
         for enemy in enemies_to_remove:
-            if enemy in self.enemies:  # Check if enemy still exists
-                self.enemies.remove(enemy)
-                new_coin = Coin(enemy.x, enemy.y)
-                self.coins.append(new_coin)
-                self.sounds["enemy_death"].play()
-
-        for enemy in self.enemies:
-            enemy.update(self.player)
-        # Check for collisions between player and enemies speciffically bullets and enemies
-        self.check_player_enemy_collisions()
-        self.check_bullet_enemy_collisions()
-        self.check_player_coin_collisions()
-
+            if enemy in self.enemies:  # Skip enemies already killed this tick
+                self.kill_enemy(enemy)
+
+    def kill_enemy(self, enemy):
+        # The enemy is only marked here; it leaves the store in compact_entities()
+        self.enemies.discard(enemy.handle)
+        self.enemy_grid.remove(enemy)
+        self.kills += 1
+        self.coins.spawn(enemy.x, enemy.y)
+        self.sounds.play("enemy_death")
+
+    def compact_entities(self): # Swap-remove everything discarded during this tick
+        self.enemies.compact()
+        self.coins.compact()
+        self.player.bullets.compact()
+
+    def check_player_death(self):
         if self.player.health <= 0: # Check if player is dead
             self.game_over = True
+
+    def update_view(self, alpha): # Move the camera to the drawn player position and redraw the floor if it moved
+        player = self.player
+        self.camera.follow(player.prev_x + (player.x - player.prev_x) * alpha,
+                           player.prev_y + (player.y - player.prev_y) * alpha)
+        if self.view_background is None:
+            self.view_background = pygame.Surface((app.WIDTH, app.HEIGHT)).convert()
+        if self.camera.offset != self.view_origin:
+            self.view_origin = self.camera.offset
+            self.floor.draw(self.view_background, *self.view_origin)
+            if self.renderer is not None: # The whole background changed
+                self.renderer.invalidate()
+
+    def draw(self, alpha=1.0): #draw game elements; alpha is how far to interpolate from the last step
+        if self.renderer is not None and not self.in_level_up_menu and not self.game_over:
+            # Dirty-rect mode: only repaint and push what moved. Sprites are drawn at their
+            # stepped positions (no interpolation) so the tracked rects match what was drawn.
+            self.update_view(1.0)
+            self.renderer.begin_frame()
+            self.draw_world()
+            hud_rects = self.draw_hud()
+            overlay_rect = self.profiler.draw_overlay(self.screen)
+            self.renderer.end_frame(self.collect_dirty_rects(hud_rects, overlay_rect))
+            self.boot.first_frame()
             return
 
-        self.spawn_enemies()
-        self.check_for_level_up()  # Call the method here
+        self.update_view(alpha)
+        if self.dirty_rects and self.renderer is None: # Takes over from the next frame
+            self.renderer = DirtyRectRenderer(self.screen, self.view_background)
+        if self.renderer is not None: # Menus cover the whole screen
+            self.renderer.invalidate()
+        self.screen.blit(self.view_background, (0, 0))
+        self.draw_world(alpha)
 
-    def draw(self): #draw game elements
-        self.screen.blit(self.background, (0, 0))
+        if self.in_level_up_menu: # Draw the upgrade menu
+            self.draw_upgrade_menu()
 
-        for coin in self.coins: # Draw coins
-            coin.draw(self.screen)
+        self.draw_hud()
 
-        if not self.game_over: # Draw player and weapon
-            self.player.draw(self.screen)
-            if self.weapon_choice == "sawblade" and self.player.sawblade:
-                self.player.sawblade.draw(self.screen)  # Draw the sawblade only if selected
+        if self.game_over:
+            self.draw_game_over_screen()
 
-        for enemy in self.enemies: # Draw enemies
-            enemy.draw(self.screen)
+        self.profiler.draw_overlay(self.screen)
+        pygame.display.flip() # Update the display
+        self.boot.first_frame()
 
-        if self.in_level_up_menu: # Draw the upgrade menu
-            self.draw_upgrade_menu()
+    def draw_world(self, alpha=1.0): # Coins, player, weapons and enemies, submitted as a few batched blits
+        queue = self.render_queue
+        camera = self.camera.offset
+        self.coins.submit(queue, camera=camera)
+
+        if not self.game_over: # Player and weapon (includes every sawblade)
+            self.player.submit(queue, alpha, camera)
+
+        self.enemies.submit(queue, alpha=alpha, camera=camera)  # Enemies plus their health bars
+        queue.flush(self.screen)
 
+    def draw_hud(self): # Returns the screen areas it drew on
         hp = max(0, min(self.player.health, 20)) # Clamp health to valid range
         health_img = self.assets["health"][hp]
-        self.screen.blit(health_img, (10, 10))
+        rects = [self.screen.blit(health_img, (10, 10))]
 
-        xp_text_surf = self.font_small.render(f"XP: {self.player.xp}", True, (255, 255, 255)) # Display XP
-        self.screen.blit(xp_text_surf, (10, 70))
+        xp_text_surf = self.text.render(self.font_small, f"XP: {self.player.xp}", (255, 255, 255)) # Display XP
+        rects.append(self.screen.blit(xp_text_surf, (10, 70)))
         next_level_xp = self.player.level * self.player.level * 5 # Calculate XP needed for next level
         xp_to_next = max(0, next_level_xp - self.player.xp)
-        xp_next_surf = self.font_small.render(f"Next Lvl XP: {xp_to_next}", True, (255, 255, 255)) # Display XP needed for next level
-        self.screen.blit(xp_next_surf, (10, 100))
-
-        if self.game_over:
-            self.draw_game_over_screen()
-
-        pygame.display.flip() # Update the display
+        xp_next_surf = self.text.render(self.font_small, f"Next Lvl XP: {xp_to_next}", (255, 255, 255)) # Display XP needed for next level
+        rects.append(self.screen.blit(xp_next_surf, (10, 100)))
+        return rects
+
+    def collect_dirty_rects(self, hud_rects, overlay_rect):
+        # Every screen area drawn this frame, or None when there are so many sprites on
+        # screen that a full flip is cheaper than tracking them
+        cx, cy = self.camera.offset  # World rects to screen rects, for what was drawn
+        coins = self.coins.visible((cx, cy))
+        xs, ys = self.enemies.positions()
+        shown = self.enemies.visible(xs - cx, ys - cy).tolist()
+        if len(shown) + len(coins) > app.DIRTY_RECT_MAX_SPRITES:
+            return None
+        rects = [coin.rect.move(-cx, -cy) for coin in coins]
+        rects.extend(self.player.draw_rects((cx, cy)))
+        views = self.enemies.views
+        rects.extend(views[i].draw_rect().move(-cx, -cy) for i in shown)
+        rects.extend(hud_rects)
+        if overlay_rect is not None:
+            rects.append(overlay_rect)
+        return rects
 
     def check_player_enemy_collisions(self): # Check for collisions between player and enemies
-        collided = False
-        for enemy in self.enemies:
-            if enemy.rect.colliderect(self.player.rect): # if enemy collides with player collision is true
-                collided = True
-                break
+        collided = bool(self.enemy_grid.query_rect(self.player.rect)) # if any enemy overlaps the player collision is true
 
         if collided: # If player collides with enemy, apply knockback and take damage
             self.player.take_damage(1)
             if self.player.health <= 0:
-                self.sounds["game_over"].play()  # Play game over sound
+                self.sounds.play("game_over")  # Play game over sound
             px, py = self.player.x, self.player.y
-            for enemy in self.enemies:
-                enemy.set_knockback(px, py, app.PUSHBACK_DISTANCE)
+            self.enemies.set_knockback_all(px, py, app.PUSHBACK_DISTANCE)
 
     def draw_game_over_screen(self):
         # Dark overlay
@@ -282,48 +560,29 @@ class Game:
         self.screen.blit(overlay, (0, 0))
 
         # Game Over text
-        game_over_surf = self.font_large.render("GAME OVER!", True, (255, 0, 0))
+        game_over_surf = self.text.render(self.font_large, "GAME OVER!", (255, 0, 0))
         game_over_rect = game_over_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 - 50))
         self.screen.blit(game_over_surf, game_over_rect)
 
         # Updated prompt to include weapon selection
-        prompt_surf = self.font_small.render("Press R to Choose New Weapon or ESC to Quit", True, (255, 255, 255))
+        prompt_surf = self.text.render(self.font_small, "Press R to Choose New Weapon or ESC to Quit", (255, 255, 255))
         prompt_rect = prompt_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 2 + 20))
         self.screen.blit(prompt_surf, prompt_rect)
 
     def find_nearest_enemy(self): # Find the nearest enemy to the player
-        if not self.enemies:
-            return None
-        nearest = None
-        min_dist = float('inf')
-        px, py = self.player.x, self.player.y
-        for enemy in self.enemies: # calculate distance to each enemy
-            dist = math.sqrt((enemy.x - px)**2 + (enemy.y - py)**2)
-            if dist < min_dist:
-                min_dist = dist
-                nearest = enemy
-        return nearest
+        nearest = self.enemy_grid.nearest(self.player.x, self.player.y, k=1)
+        return nearest[0] if nearest else None
 
     def check_bullet_enemy_collisions(self): # Check for collisions between bullets and enemies
-        for bullet in self.player.bullets[:]:
-            for enemy in self.enemies[:]:  # Create a copy to safely modify
-                if bullet.rect.colliderect(enemy.rect):
-                    if enemy.take_damage(bullet.damage):  # Enemy dies
-                        self.enemies.remove(enemy)
-                        new_coin = Coin(enemy.x, enemy.y)
-                        self.coins.append(new_coin)
-                        self.sounds["enemy_death"].play()
+        killed_enemies = self.player.bullets.collide(self.enemy_grid)  # Spent bullets are freed by the pool
+        for enemy in killed_enemies:
+            if enemy in self.enemies:
+                self.kill_enemy(enemy)
 
     def check_player_coin_collisions(self):# Check for collisions between player and coins
-        coins_collected = []
-        for coin in self.coins:
-            if coin.rect.colliderect(self.player.rect):
-                coins_collected.append(coin)
-                self.player.add_xp(1)
-
-        for c in coins_collected:
-            if c in self.coins:
-                self.coins.remove(c)
+        value = self.coins.collect(self.player.x, self.player.y, app.COIN_PICKUP_RADIUS)
+        if value:
+            self.player.add_xp(value)  # A stack is worth the coins merged into it
 
     def pick_random_upgrades(self, num): # Pick random upgrades based on the weapon choice
         if self.weapon_choice == "bullet":
@@ -396,11 +655,7 @@ class Game:
         elif self.weapon_choice == "sawblade":
             if name == "Larger Sawblade":
                 for blade in player.sawblades:
-                    blade.size += 10
-                    blade.original_image = pygame.transform.scale(
-                        blade.original_image, 
-                        (blade.size, blade.size)
-                    )
+                    blade.set_size(blade.size + 10)
             elif name == "Sharper Sawblade":
                 for blade in player.sawblades:
                     blade.damage += 2
@@ -436,14 +691,14 @@ class Game:
         self.screen.blit(overlay, (0, 0))
 
         # Title
-        title_surf = self.font_large.render("Choose an Upgrade!", True, (255, 255, 0))
+        title_surf = self.text.render(self.font_large, "Choose an Upgrade!", (255, 255, 0))
         title_rect = title_surf.get_rect(center=(app.WIDTH // 2, app.HEIGHT // 3 - 50))
         self.screen.blit(title_surf, title_rect)
 
         # Options
         for i, upgrade in enumerate(self.upgrade_options):
             text_str = f"{i+1}. {upgrade['name']} - {upgrade['desc']}"
-            option_surf = self.font_small.render(text_str, True, (255, 255, 255))
+            option_surf = self.text.render(self.font_small, text_str, (255, 255, 255))
             line_y = app.HEIGHT // 3 + i * 40
             option_rect = option_surf.get_rect(center=(app.WIDTH // 2, line_y))
             self.screen.blit(option_surf, option_rect)
@@ -457,5 +712,5 @@ class Game:
             self.upgrade_options = self.pick_random_upgrades(3)
             # Increase enemy spawns each time we level up
             self.enemies_per_spawn += 1
-            self.sounds["level_up"].play()  # Play level-up sound
+            self.sounds.play("level_up")  # Play level-up sound
 
@@ -1,8 +1,50 @@
 # main.py
+import argparse
+import time
+
+import app
 from game import Game
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Shooter")
+    parser.add_argument("--headless", action="store_true",
+                        help="run the simulation without a window or sound, as fast as possible")
+    parser.add_argument("--weapon", choices=["bullet", "sawblade", "lightning"],
+                        help="start with this weapon instead of showing the selection screen")
+    parser.add_argument("--ticks", type=int, help="stop after this many game updates")
+    parser.add_argument("--seed", type=int, help="seed for every random choice in the game")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame profiler overlay on (F3 toggles it in game)")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only repaint the parts of the screen that changed (for low-power machines)")
+    parser.add_argument("--fps", type=int, default=app.FPS,
+                        help="render frame cap, 0 for uncapped (e.g. 30 on weak machines); game speed is unaffected")
+    parser.add_argument("--record", metavar="PATH", help="record this game's input to a file for exact replays")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="replay a recorded game (seed and weapon come from the recording); "
+                             "with --headless it runs as fast as possible")
+    parser.add_argument("--boot-timeline", action="store_true",
+                        help="print how long each startup stage took (and the time to the first frame) on exit")
+    parser.add_argument("--profile-csv", metavar="PATH", help="write per-frame profiler timings to a CSV file")
+    args = parser.parse_args()
+    if args.headless and args.weapon is None and args.replay is None:
+        parser.error("--headless needs --weapon or --replay (there is no selection screen)")
+    return args
+
 def main():
-    game = Game()
+    args = parse_args()
+    game = Game(headless=args.headless, seed=args.seed, weapon=args.weapon, max_ticks=args.ticks,
+                profile=args.profile, profile_csv=args.profile_csv, dirty_rects=args.dirty_rects,
+                render_fps=args.fps, record=args.record, replay=args.replay)
+    start = time.perf_counter()
     game.run()
+    if args.headless:
+        elapsed = time.perf_counter() - start
+        print(f"ticks={game.ticks} seconds={elapsed:.2f} ticks_per_second={game.ticks / max(elapsed, 1e-9):.0f} "
+              f"level={game.player.level} xp={game.player.xp} enemies={len(game.enemies)} "
+              f"game_over={game.game_over}")
+    if args.boot_timeline:
+        print(game.boot.report())
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,95 @@
+# obstacles.py
+import random
+from collections import OrderedDict
+
+import numpy as np
+import pygame
+import app
+
+class ObstacleMap:
+    # Stone pillars scattered over the world, at most one per floor chunk. Like the
+    # floor, a chunk's pillar comes from a generator seeded with the chunk coordinate,
+    # so nothing has to be stored for the parts of the world far from the player.
+    # Pillars are whole cells (one floor tile each) and keep a one cell gap to the
+    # chunk edge, so two pillars never touch and every open cell stays reachable.
+    def __init__(self, seed=0, chance=app.OBSTACLE_CHANCE, cell_size=app.FLOW_CELL_SIZE,
+                 chunk_cells=app.FLOOR_CHUNK_TILES, max_chunks=4096):
+        self.seed = seed
+        self.chance = chance
+        self.cell_size = cell_size
+        self.chunk_cells = chunk_cells
+        self.chunk_size = cell_size * chunk_cells
+        self.max_chunks = max_chunks
+        self.chunks = OrderedDict()  # (cx, cy) -> pillar rect in cells, or None
+
+    def pillar(self, cx, cy): # Pillar of a chunk in cell coordinates (None if the chunk is open)
+        key = (cx, cy)
+        if key in self.chunks:
+            self.chunks.move_to_end(key)
+            return self.chunks[key]
+        rect = None
+        if self.chance > 0:
+            rng = random.Random(f"{self.seed}:pillar:{cx}:{cy}")
+            if rng.random() < self.chance:
+                w, h = rng.randint(1, 3), rng.randint(1, 3)
+                x = rng.randint(1, self.chunk_cells - 1 - w)
+                y = rng.randint(1, self.chunk_cells - 1 - h)
+                rect = pygame.Rect(cx * self.chunk_cells + x, cy * self.chunk_cells + y, w, h)
+        self.chunks[key] = rect
+        if len(self.chunks) > self.max_chunks:
+            self.chunks.popitem(last=False)
+        return rect
+
+    def pillars(self, rect): # Pillars (world rects) overlapping a world rect
+        size = self.chunk_size
+        cell = self.cell_size
+        found = []
+        for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+            for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+                pillar = self.pillar(cx, cy)
+                if pillar is not None:
+                    world = pygame.Rect(pillar.x * cell, pillar.y * cell, pillar.w * cell, pillar.h * cell)
+                    if world.colliderect(rect):
+                        found.append(world)
+        return found
+
+    def collides(self, rect):
+        return bool(self.pillars(rect))
+
+    def blocked(self, xs, ys): # Mask of the world positions (arrays) that are inside a pillar
+        inside = np.zeros(len(xs), dtype=bool)
+        if self.chance <= 0 or len(xs) == 0:
+            return inside
+        cell = self.cell_size
+        cx = np.floor_divide(xs, cell).astype(np.int64)
+        cy = np.floor_divide(ys, cell).astype(np.int64)
+        # A pillar never leaves its chunk, so each position is only tested against the
+        # pillar of its own chunk; the chunk lookups run once per distinct chunk
+        chunk_x = np.floor_divide(cx, self.chunk_cells)
+        chunk_y = np.floor_divide(cy, self.chunk_cells)
+        keys = chunk_x * (1 << 32) + chunk_y
+        keys, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+        bounds = np.zeros((len(keys), 4), dtype=np.int64)  # left, top, right, bottom (empty by default)
+        for i, (kx, ky) in enumerate(zip(chunk_x[first].tolist(), chunk_y[first].tolist())):
+            pillar = self.pillar(kx, ky)
+            if pillar is not None:
+                bounds[i] = pillar.left, pillar.top, pillar.right, pillar.bottom
+        bounds = bounds[inverse.reshape(-1)]
+        return (cx >= bounds[:, 0]) & (cx < bounds[:, 2]) & (cy >= bounds[:, 1]) & (cy < bounds[:, 3])
+
+    def walkable(self, x0, y0, width, height): # Bool array [row, column] of the cells x0.., y0..
+        walk = np.ones((height, width), dtype=bool)
+        cell = self.cell_size
+        for pillar in self.pillars(pygame.Rect(x0 * cell, y0 * cell, width * cell, height * cell)):
+            left, top = pillar.x // cell - x0, pillar.y // cell - y0
+            right, bottom = pillar.right // cell - x0, pillar.bottom // cell - y0
+            walk[max(top, 0):max(bottom, 0), max(left, 0):max(right, 0)] = False
+        return walk
+
+    def draw(self, surface, left, top): # Pillars of the world area whose top-left corner is (left, top)
+        area = pygame.Rect(left, top, surface.get_width(), surface.get_height())
+        for pillar in self.pillars(area):
+            rect = pillar.move(-left, -top)
+            pygame.draw.rect(surface, (58, 54, 66), rect)
+            pygame.draw.rect(surface, (96, 90, 108), (rect.x, rect.y, rect.w, 6))  # Lit top edge
+            pygame.draw.rect(surface, (30, 28, 36), rect, 2)
@@ -1,16 +1,17 @@
 import pygame
 import app
 import math
-import os
 
-from bullet import Bullet
+from bullet import BulletPool
 from Sawblade import Sawblade  # Import the Sawblade class
 from LightningStaff import LightningStaff
+from camera import view_rect
 
 class Player:
-    def __init__(self, x, y, assets, weapon_choice):
+    def __init__(self, x, y, assets, weapon_choice, sounds=None):
         self.x = x
         self.y = y
+        self.prev_x, self.prev_y = x, y  # Position at the start of the current step (for drawing)
         self.level = 1
 
         self.speed = app.PLAYER_SPEED
@@ -20,9 +21,9 @@ class Player:
         self.animation_timer = 0
         self.animation_speed = 8
 
-        self.image = self.animations[self.state][self.frame_index]
-        self.rect = self.image.get_rect(center=(self.x, self.y))
         self.facing_left = False
+        self.image = self.animations[self.state][self.facing_left][self.frame_index]
+        self.rect = self.image.get_rect(center=(self.x, self.y))
 
         self.health = 5
         self.xp = 0
@@ -32,11 +33,13 @@ class Player:
         self.bullet_count = 1
         self.bullet_spread = 10  # Angle spread between bullets
         self.bullet_damage = 6  # Changed from 1 to 6
+        self.bullet_pierce = 0  # Extra enemies each bullet passes through
         self.shoot_cooldown = 20
         self.shoot_timer = 0
-        self.bullets = []
+        self.bullets = BulletPool()
 
         self.weapon_choice = weapon_choice
+        self.sounds = sounds  # Game's SoundManager
         self.sawblades = []
         if self.weapon_choice == "sawblade":
             self.sawblade = Sawblade(self.x, self.y)  # Main sawblade
@@ -47,9 +50,13 @@ class Player:
             self.sawblade = None
 
         self.enemies = []  # Add enemies as instance variable
+        self.enemy_grid = None  # Spatial index over enemies, set by the game
+        self.obstacles = None  # ObstacleMap the player cannot walk through, set by the game
+        self.autofire = False  # Behave as if spacebar is held (used by headless runs)
 
-    def handle_input(self):
-        keys = pygame.key.get_pressed()
+    def handle_input(self, keys=None): # keys: anything indexable by pygame key constants
+        if keys is None:
+            keys = pygame.key.get_pressed()
 
         vel_x, vel_y = 0, 0
 
@@ -63,11 +70,17 @@ class Player:
         if keys[pygame.K_DOWN]:
             vel_y += self.speed
 
-        self.x += vel_x
-        self.y += vel_y
-
-        self.x = max(0, min(self.x, app.WIDTH))
-        self.y = max(0, min(self.y, app.HEIGHT))
+        move_x, move_y = vel_x, vel_y
+        if self.obstacles is not None: # One axis at a time, so the player slides along pillars
+            if move_x and self.obstacles.collides(self.collision_box(self.x + move_x, self.y)):
+                move_x = 0
+            if move_y and self.obstacles.collides(self.collision_box(self.x + move_x, self.y + move_y)):
+                move_y = 0
+        self.x += move_x
+        self.y += move_y
+
+        self.x = max(0, min(self.x, app.WORLD_WIDTH))
+        self.y = max(0, min(self.y, app.WORLD_HEIGHT))
         self.rect.center = (self.x, self.y)
 
         if vel_x != 0 or vel_y != 0:
@@ -81,12 +94,13 @@ class Player:
             self.facing_left = False
 
         # Auto-aim with spacebar
-        if keys[pygame.K_SPACE] and self.weapon_choice == "bullet" and self.shoot_timer == 0:
+        if (keys[pygame.K_SPACE] or self.autofire) and self.weapon_choice == "bullet" and self.shoot_timer == 0:
             nearest_enemy = self.find_nearest_enemy(self.enemies)
             if nearest_enemy:
                 self.shoot_toward_enemy(nearest_enemy)
                 self.shoot_timer = self.shoot_cooldown  # Reset the timer
-                pygame.mixer.Sound(os.path.join("assets", "shoot.wav")).play()  # Play shooting sound
+                if self.sounds is not None:
+                    self.sounds.play("shoot")  # Play shooting sound (preloaded)
                 
         # Control main sawblade with WASD
         if self.weapon_choice == "sawblade":
@@ -100,9 +114,17 @@ class Player:
             if dx != 0 or dy != 0:
                 self.sawblades[0].apply_movement(dx * self.speed * 1.2, dy * self.speed * 1.2)
 
+    def collision_box(self, x, y): # Body area that is kept out of pillars
+        box = pygame.Rect(0, 0, 24, 24)
+        box.center = (x, y)
+        return box
+
     def find_nearest_enemy(self, enemies):
         if not enemies:
             return None
+        if self.enemy_grid is not None: # Grid lookup instead of scanning every enemy
+            nearest = self.enemy_grid.nearest(self.x, self.y, k=1)
+            return nearest[0] if nearest else None
         nearest = None
         min_dist = float('inf')
         for enemy in enemies:
@@ -118,25 +140,22 @@ class Player:
             self.shoot_timer -= 1
 
         if self.weapon_choice == "bullet":
-            for bullet in self.bullets:
-                bullet.update()
-
-                if bullet.x < 0 or bullet.y > app.HEIGHT or bullet.x < 0 or bullet.x > app.WIDTH:
-                    self.bullets.remove(bullet)
+            self.bullets.update(view_rect(self.x, self.y))  # Moves bullets and frees the ones that left the view
 
         self.animation_timer += 1
         if self.animation_timer >= self.animation_speed:
             self.animation_timer = 0
-            frames = self.animations[self.state]
-            self.frame_index = (self.frame_index + 1) % len(frames)
-            self.image = frames[self.frame_index]
-            center = self.rect.center
-            self.rect = self.image.get_rect()
-            self.rect.center = center
+            self.frame_index = (self.frame_index + 1) % len(self.animations[self.state][0])
+        # Pick the pre-flipped frame for the current facing (no per-frame transforms)
+        self.image = self.animations[self.state][self.facing_left][self.frame_index]
+        center = self.rect.center
+        self.rect = self.image.get_rect()
+        self.rect.center = center
 
         if self.weapon_choice == "sawblade":
             # Update main sawblade position
             main_blade = self.sawblades[0]
+            main_blade.bounds = view_rect(self.x, self.y)  # The blade stays on screen
             main_blade.update()
             
             # Update orbiting sawblades
@@ -164,23 +183,51 @@ class Player:
             new_blade.damage = self.sawblade.damage
             self.sawblades.append(new_blade)
 
-    def draw(self, surface):
-        if self.facing_left:
-            flipped_img = pygame.transform.flip(self.image, True, False)
-            surface.blit(flipped_img, self.rect)
-        else:
-            surface.blit(self.image, self.rect)
+    def reach_rects(self): # World rects this weapon can hit enemies in, beyond the area around the view
+        if self.weapon_choice == "lightning":
+            return self.lightning_staff.reach_rects()
+        if self.weapon_choice == "sawblade":
+            # Orbiting blades circle the main blade, which is kept in the view, but the
+            # outer ones (and "Wider Orbit") swing well past the area around it
+            main_blade = self.sawblades[0]
+            reach = int(max(blade.orbit_radius for blade in self.sawblades) + main_blade.size) + 1
+            return [pygame.Rect(main_blade.x - reach, main_blade.y - reach, 2 * reach, 2 * reach)]
+        return []
+
+    def store_previous_positions(self): # Called at the start of every simulation step
+        self.prev_x, self.prev_y = self.x, self.y
+        self.bullets.store_previous_positions()
+        for blade in self.sawblades:
+            blade.prev_x, blade.prev_y = blade.x, blade.y
+
+    def submit(self, queue, alpha=1.0, camera=(0, 0)):
+        # Queue the player and weapon sprites for batched drawing. With alpha < 1 the
+        # player is drawn between the last two steps, the staff with it; bullets and
+        # sawblades move on their own and are interpolated from their own positions.
+        # camera is the world position of the screen's top-left corner.
+        offset = (round((self.prev_x - self.x) * (1 - alpha)) - camera[0],
+                  round((self.prev_y - self.y) * (1 - alpha)) - camera[1])
+        queue.add("player", self.image, self.rect.move(offset))
 
         if self.weapon_choice == "bullet":
-            for bullet in self.bullets:
-                bullet.draw(surface)
+            self.bullets.submit(queue, alpha=alpha, camera=camera)
 
         if self.weapon_choice == "sawblade":
-            for blade in self.sawblades:
-                blade.draw(surface)
+            queue.extend("weapons", [(blade.image, blade.draw_rect(alpha, camera)) for blade in self.sawblades])
 
         elif self.weapon_choice == "lightning":
-            self.lightning_staff.draw(surface)
+            self.lightning_staff.submit(queue, offset=offset, camera=camera)
+
+    def draw_rects(self, camera=(0, 0)): # Screen areas covered by submit(), for the dirty-rect renderer
+        cx, cy = camera
+        rects = [self.rect.move(-cx, -cy)]
+        if self.weapon_choice == "bullet":
+            rects.extend(self.bullets.rects(camera))
+        elif self.weapon_choice == "sawblade":
+            rects.extend(blade.draw_rect(camera=camera) for blade in self.sawblades)
+        elif self.weapon_choice == "lightning":
+            rects.extend(self.lightning_staff.drawn_rects)
+        return rects
 
     def take_damage(self, amount):
         self.health = max(0, self.health - amount)
@@ -210,9 +257,8 @@ class Player:
             final_vx = math.cos(angle) * self.bullet_speed
             final_vy = math.sin(angle) * self.bullet_speed
 
-            bullet = Bullet(self.x, self.y, final_vx, final_vy, self.bullet_size, 
-                            damage=self.bullet_damage)
-            self.bullets.append(bullet)
+            self.bullets.spawn(self.x, self.y, final_vx, final_vy, self.bullet_size,
+                               damage=self.bullet_damage, pierce=self.bullet_pierce)
         self.shoot_timer = 0
 
     def shoot_toward_mouse(self, pos):
@@ -0,0 +1,188 @@
+# profiler.py
+# Toggleable frame profiler. While enabled it wraps Game.update/Game.draw, every
+# update phase and the per-weapon hooks with timers, keeps rolling averages and
+# entity counts, draws a compact overlay and can stream one CSV row per frame.
+# While disabled nothing is wrapped, so the only cost is one check per frame.
+import csv
+import os
+import time
+from collections import deque
+
+import pygame
+
+from Sawblade import Sawblade
+from LightningStaff import LightningStaff
+from enemy import EnemyStore
+from render_queue import RenderQueue
+
+# (class, method name, label) for hooks that are patched at class level so that
+# objects created while profiling (e.g. new orbiting sawblades) are covered too
+CLASS_HOOKS = [
+    (LightningStaff, "check_collision", "lightning.check_collision"),
+    (LightningStaff, "draw_lightning", "lightning.draw_lightning"),
+    (Sawblade, "check_collision", "sawblade.check_collision"),
+    (Sawblade, "update", "sawblade.update"),
+    (EnemyStore, "draw_health_bars", "enemy.health_bars"),
+    (RenderQueue, "flush", "render.flush"),
+]
+
+class FrameProfiler:
+    def __init__(self, window=120, csv_path=None):
+        self.enabled = False
+        self.window = window  # Frames kept for the rolling averages
+        self.csv_path = csv_path
+        self.csv_file = None
+        self.csv_writer = None
+        self.csv_started = False  # Header written; later enables append to the same file
+        self.frame = 0
+
+        self.labels = []
+        self.current = {}  # label -> seconds spent this frame
+        self.history = {}  # label -> deque of per-frame milliseconds
+        self.counts = {}
+        self.font = None
+        self._restore = []  # Callables that undo every patch made by enable()
+
+    # --------------------------------------------------------------------------
+    #                       ENABLING / DISABLING
+    # --------------------------------------------------------------------------
+
+    def toggle(self, game):
+        if self.enabled:
+            self.disable(game)
+        else:
+            self.enable(game)
+
+    def enable(self, game):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.labels = ["update", "draw"]
+
+        # Whole update/draw, as instance attributes shadowing the methods
+        for name in ("update", "draw"):
+            setattr(game, name, self.timed(name, getattr(game, name)))
+            self._restore.append(lambda name=name: delattr(game, name))
+
+        # Every update phase (the collision passes live here)
+        original_phases = game.update_phases
+        game.update_phases = [(name, self.timed("update." + name, phase)) for name, phase in original_phases]
+        self.labels.extend("update." + name for name, _ in original_phases)
+        self._restore.append(lambda: setattr(game, "update_phases", original_phases))
+
+        # Per-weapon hooks
+        for cls, name, label in CLASS_HOOKS:
+            original = cls.__dict__[name]
+            setattr(cls, name, self.timed(label, original))
+            self.labels.append(label)
+            self._restore.append(lambda cls=cls, name=name, original=original: setattr(cls, name, original))
+
+        self.current = {label: 0.0 for label in self.labels}
+        self.history = {label: deque(maxlen=self.window) for label in self.labels}
+        if self.csv_path:
+            self.open_csv()
+
+    def disable(self, game):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for restore in reversed(self._restore):
+            restore()
+        self._restore = []
+        self.close_csv()
+
+    def timed(self, label, func):
+        # Wrap func so the time spent in it is added to this frame's total for label
+        clock = time.perf_counter
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.current[label] += clock() - start
+        return wrapper
+
+    # --------------------------------------------------------------------------
+    #                       PER-FRAME RECORDING
+    # --------------------------------------------------------------------------
+
+    def end_frame(self, game): # Called once per frame by the game loop
+        if not self.enabled:
+            return
+        self.frame += 1
+        for label in self.labels:
+            self.history[label].append(self.current[label] * 1000)
+            self.current[label] = 0.0
+
+        player = game.player
+        self.counts = {
+            "enemies": len(game.enemies),
+            "bullets": len(player.bullets),
+            "coins": len(game.coins),
+            "sawblades": len(player.sawblades),
+            "mini_staffs": len(player.lightning_staff.mini_staffs) if player.weapon_choice == "lightning" else 0,
+            "sounds": game.sounds.frame_play_count(),
+        }
+
+        if self.csv_writer is not None:
+            row = [self.frame]
+            row.extend(round(self.history[label][-1], 4) for label in self.labels)
+            row.extend(self.counts.values())
+            self.csv_writer.writerow(row)
+
+    def average(self, label):
+        samples = self.history.get(label)
+        if not samples:
+            return 0.0
+        return sum(samples) / len(samples)
+
+    def peak(self, label):
+        samples = self.history.get(label)
+        return max(samples) if samples else 0.0
+
+    # --------------------------------------------------------------------------
+    #                               CSV EXPORT
+    # --------------------------------------------------------------------------
+
+    def open_csv(self): # Truncates the file on the first enable only, so toggling F3 keeps earlier rows
+        self.csv_file = open(self.csv_path, "a" if self.csv_started else "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        if not self.csv_started:
+            count_names = ["enemies", "bullets", "coins", "sawblades", "mini_staffs", "sounds"]
+            self.csv_writer.writerow(["frame"] + [label + "_ms" for label in self.labels] + count_names)
+            self.csv_started = True
+
+    def close_csv(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+        self.csv_file = None
+        self.csv_writer = None
+
+    # --------------------------------------------------------------------------
+    #                               OVERLAY
+    # --------------------------------------------------------------------------
+
+    def draw_overlay(self, surface): # Returns the overlay's screen rect (None when disabled)
+        if not self.enabled:
+            return None
+        if self.font is None:
+            self.font = pygame.font.Font(os.path.join("assets", "PressStart2P.ttf"), 8)
+
+        lines = []
+        for label in self.labels:
+            avg = self.average(label)
+            if label in ("update", "draw") or avg >= 0.01: # Skip hooks that are not doing anything
+                lines.append(f"{label:<32}{avg:6.2f} {self.peak(label):6.2f}")
+        lines.append(" ".join(f"{name}={count}" for name, count in self.counts.items()))
+
+        line_h = 11
+        width = 380
+        panel = pygame.Surface((width, line_h * (len(lines) + 1) + 6), pygame.SRCALPHA)
+        panel.fill((0, 0, 0, 170))
+        header = self.font.render(f"{'ms (avg / peak)':<32}", True, (255, 255, 0))
+        panel.blit(header, (4, 4))
+        for i, line in enumerate(lines):
+            text = self.font.render(line, True, (255, 255, 255))
+            panel.blit(text, (4, 4 + line_h * (i + 1)))
+        return surface.blit(panel, (surface.get_width() - width - 10, 10))
@@ -0,0 +1,39 @@
+# render_queue.py
+class RenderQueue:
+    # Collects (image, rect) pairs from every entity during a frame and submits each
+    # layer with one Surface.blits call (fblits where available) instead of one blit per
+    # object. Layers are drawn in order; primitive drawing (lines, bars) is queued as
+    # callbacks that run right after their layer's sprites.
+    LAYERS = ("coins", "player", "weapons", "enemies", "health_bars")
+
+    def __init__(self, layers=LAYERS):
+        self.order = list(layers)
+        self.layers = {name: [] for name in self.order}
+        self.callbacks = {name: [] for name in self.order}
+
+    def add(self, layer, image, rect):
+        self.layers[layer].append((image, rect))
+
+    def extend(self, layer, pairs):
+        self.layers[layer].extend(pairs)
+
+    def add_draw(self, layer, func): # func(surface) is called after the layer's sprites
+        self.callbacks[layer].append(func)
+
+    def clear(self):
+        for name in self.order:
+            self.layers[name].clear()
+            self.callbacks[name].clear()
+
+    def flush(self, surface):
+        fblits = getattr(surface, "fblits", None)  # pygame-ce only
+        for name in self.order:
+            pairs = self.layers[name]
+            if pairs:
+                if fblits is not None:
+                    fblits(pairs)
+                else:
+                    surface.blits(pairs, doreturn=False)
+            for func in self.callbacks[name]:
+                func(surface)
+        self.clear()
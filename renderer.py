@@ -0,0 +1,50 @@
+# renderer.py
+import pygame
+
+class DirtyRectRenderer:
+    # Redraws and pushes only the parts of the screen that changed. Each frame the
+    # background is restored under last frame's sprites, the scene is drawn, and the
+    # union of last and current sprite rects is sent to pygame.display.update.
+    # When that area gets large (or after invalidate()) it falls back to a full flip.
+    def __init__(self, screen, background, full_redraw_ratio=0.4):
+        self.screen = screen
+        self.background = background
+        self.full_redraw_area = full_redraw_ratio * screen.get_width() * screen.get_height()
+        self.previous = []  # Rects drawn last frame
+        self.full = True  # Next frame must redraw and flip everything
+        self.full_frames = 0  # Counters for instrumentation
+        self.partial_frames = 0
+
+    def invalidate(self): # Call when something outside the tracked sprites changed
+        self.full = True
+
+    def set_background(self, background):
+        self.background = background
+        self.invalidate()
+
+    def area(self, rects):
+        return sum(rect.width * rect.height for rect in rects)
+
+    def begin_frame(self):
+        if self.full or self.area(self.previous) > self.full_redraw_area:
+            self.full = True
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous: # Erase last frame's sprites
+                self.screen.blit(self.background, rect, rect)
+
+    def end_frame(self, rects):
+        # rects: everything drawn this frame, or None if the caller did not track them
+        untracked = rects is None
+        if untracked:
+            self.full = True
+            rects = []
+        dirty = self.previous + rects
+        if self.full or self.area(dirty) > self.full_redraw_area:
+            pygame.display.flip()
+            self.full_frames += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_frames += 1
+        self.previous = rects
+        self.full = untracked  # Without rects we cannot know what to erase next frame
@@ -0,0 +1,138 @@
+# replay.py
+# Input recording and replay. A recording holds everything the simulation reads from
+# the player for one game: the seed the game starts from, the weapon, the held keys
+# of every tick and the clicks / upgrade picks made between ticks. Feeding it back
+# through the same Game methods reproduces the game exactly, headless or rendered.
+#
+# File layout (little-endian):
+#   header   magic "SHRP", version u8, weapon u8, flags u8, seed u64, ticks u32, runs u32, events u32
+#   runs     (key mask u16, tick count u32) run-length encoded held keys, one mask per tick
+#   events   (tick u32, kind u8, a i16, b i16)
+import struct
+from array import array
+
+import pygame
+
+MAGIC = b"SHRP"
+VERSION = 1
+HEADER = struct.Struct("<4sBBBQIII")
+RUN = struct.Struct("<HI")
+EVENT = struct.Struct("<IBhh")
+
+WEAPONS = ["bullet", "sawblade", "lightning"]
+FLAG_AUTOFIRE = 1
+
+# Keys read by Player.handle_input, one bit each in the per-tick mask
+KEY_BITS = (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_DOWN, pygame.K_SPACE,
+            pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d)
+KEY_INDEX = {key: bit for bit, key in enumerate(KEY_BITS)}
+
+# Inputs handled by Game between ticks
+EVENT_CLICK = 1  # a, b = mouse position
+EVENT_UPGRADE = 2  # a = index of the chosen upgrade option
+EVENT_LEVEL_UP = 3  # Debug level up (L key)
+
+def key_mask(keys):
+    mask = 0
+    for bit, key in enumerate(KEY_BITS):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+class MaskKeys:
+    # Stands in for pygame.key.get_pressed() with the keys of a recorded mask
+    def __init__(self, mask):
+        self.mask = mask
+
+    def __getitem__(self, key):
+        bit = KEY_INDEX.get(key)
+        return bit is not None and bool(self.mask >> bit & 1)
+
+class InputRecorder:
+    def __init__(self, path, seed):
+        self.path = path
+        self.seed = seed
+        self.weapon = None
+        self.autofire = False
+        self.start_tick = 0
+        self.started = False
+        self.ticks = 0
+        self.runs = []  # [mask, count]
+        self.events = []  # (tick, kind, a, b)
+
+    def start(self, weapon, autofire, tick): # Called when the recorded game begins
+        self.weapon = weapon
+        self.autofire = autofire
+        self.start_tick = tick
+        self.started = True
+
+    def record_keys(self, keys):
+        mask = key_mask(keys)
+        if self.runs and self.runs[-1][0] == mask:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([mask, 1])
+        self.ticks += 1
+
+    def record_event(self, tick, kind, a=0, b=0):
+        self.events.append((tick - self.start_tick, kind, a, b))
+
+    def save(self):
+        flags = FLAG_AUTOFIRE if self.autofire else 0
+        with open(self.path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, WEAPONS.index(self.weapon), flags, self.seed,
+                                self.ticks, len(self.runs), len(self.events)))
+            for mask, count in self.runs:
+                f.write(RUN.pack(mask, count))
+            for event in self.events:
+                f.write(EVENT.pack(*event))
+
+class InputReplay:
+    def __init__(self, seed, weapon, autofire, masks, events):
+        self.seed = seed
+        self.weapon = weapon
+        self.autofire = autofire
+        self.masks = masks  # Key mask of every tick
+        self.events = events
+        self.next_event = 0
+        self.start_tick = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, weapon, flags, seed, ticks, run_count, event_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} input recording")
+        offset = HEADER.size
+        masks = array("H")
+        for mask, count in RUN.iter_unpack(data[offset:offset + run_count * RUN.size]):
+            masks.extend([mask] * count)
+        offset += run_count * RUN.size
+        events = list(EVENT.iter_unpack(data[offset:offset + event_count * EVENT.size]))
+        if len(masks) != ticks:
+            raise ValueError(f"{path} is truncated")
+        return cls(seed, WEAPONS[weapon], bool(flags & FLAG_AUTOFIRE), masks, events)
+
+    def start(self, tick):
+        self.start_tick = tick
+        self.next_event = 0
+
+    def finished(self, game):
+        return game.ticks - self.start_tick >= len(self.masks)
+
+    def keys(self, game): # Game.input_source for the current tick
+        return MaskKeys(self.masks[game.ticks - self.start_tick])
+
+    def apply_events(self, game): # Replay every click and pick recorded before the current tick
+        tick = game.ticks - self.start_tick
+        events = self.events
+        while self.next_event < len(events) and events[self.next_event][0] <= tick:
+            _, kind, a, b = events[self.next_event]
+            self.next_event += 1
+            if kind == EVENT_CLICK:
+                game.click((a, b))
+            elif kind == EVENT_UPGRADE:
+                game.choose_upgrade(a)
+            elif kind == EVENT_LEVEL_UP:
+                game.debug_level_up()
@@ -0,0 +1,68 @@
+# sound.py
+import os
+import pygame
+
+# name: (file, volume, reserved mixer channels, max starts per frame)
+SOUNDS = {
+    "shoot":       ("shoot.wav",       0.5, 2, 1),
+    "enemy_death": ("enemy_death.wav", 0.5, 4, 2),
+    "level_up":    ("level_up.wav",    0.7, 1, 1),
+    "game_over":   ("death.wav",       0.7, 1, 1),
+    "lightning":   ("lightning.wav",   0.4, 2, 1),  # Lower volume for lightning
+}
+
+class SoundManager:
+    # Loads every clip once and plays each category on its own reserved mixer
+    # channels. Repeated triggers of the same sound within one frame (e.g. 50 kills
+    # from one lightning chain) are coalesced down to a small per-frame limit.
+    def __init__(self, folder="assets", sounds=SOUNDS):
+        self.sounds = {}
+        self.channels = {}  # name -> list of reserved channels
+        self.next_channel = {}  # name -> index of the channel to use next (round robin)
+        self.limits = {}
+        self.frame_plays = {}  # Starts this frame, per sound
+        self.play_counts = {name: 0 for name in sounds}  # Sounds actually started
+        self.dropped_counts = {name: 0 for name in sounds}  # Triggers coalesced away
+        self.enabled = pygame.mixer.get_init() is not None  # No audio device: stay silent
+        if not self.enabled:
+            return
+
+        total_channels = sum(channels for _, _, channels, _ in sounds.values())
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), total_channels))
+        pygame.mixer.set_reserved(total_channels)  # Keep these away from Sound.play()
+
+        first = 0
+        for name, (filename, volume, channels, limit) in sounds.items():
+            sound = pygame.mixer.Sound(os.path.join(folder, filename))
+            sound.set_volume(volume)
+            self.sounds[name] = sound
+            self.channels[name] = [pygame.mixer.Channel(i) for i in range(first, first + channels)]
+            self.next_channel[name] = 0
+            self.limits[name] = limit
+            first += channels
+
+    def play(self, name):
+        if not self.enabled:
+            return
+        played = self.frame_plays.get(name, 0)
+        if played >= self.limits[name]:
+            self.dropped_counts[name] += 1
+            return
+        self.frame_plays[name] = played + 1
+        self.play_counts[name] += 1
+
+        # Prefer an idle channel of this category, otherwise cut off the oldest one
+        channels = self.channels[name]
+        for channel in channels:
+            if not channel.get_busy():
+                channel.play(self.sounds[name])
+                return
+        index = self.next_channel[name]
+        channels[index].play(self.sounds[name])
+        self.next_channel[name] = (index + 1) % len(channels)
+
+    def frame_play_count(self): # Sounds started this frame (for instrumentation)
+        return sum(self.frame_plays.values())
+
+    def begin_frame(self):
+        self.frame_plays.clear()
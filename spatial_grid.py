@@ -0,0 +1,154 @@
+import math
+import numpy as np
+
+class SpatialGrid:
+    def __init__(self, cell_size=64):
+        # Entities are bucketed into square cells keyed by (cell_x, cell_y) of their center.
+        # An entity is expected to stay put between being inserted and removed; the grid
+        # is rebuilt every tick after things move.
+        self.cell_size = cell_size
+        self.cells = {}
+        self.bounds = None  # (min_cx, min_cy, max_cx, max_cy) of every cell used since the last clear
+
+    def cell_key(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def clear(self):
+        self.cells.clear()
+        self.bounds = None
+
+    def rebuild(self, entities, xs=None, ys=None):
+        # Re-bucket every entity from scratch (done once per tick). When the caller already
+        # holds positions as NumPy arrays the cell keys are computed and grouped in bulk.
+        self.clear()
+        if xs is None:
+            for entity in entities:
+                self.insert(entity)
+            return
+        if len(entities) == 0:
+            return
+
+        entities = list(entities)
+        cx = np.floor_divide(xs, self.cell_size).astype(np.int64)
+        cy = np.floor_divide(ys, self.cell_size).astype(np.int64)
+        min_x, min_y = cx.min(), cy.min()
+        self.bounds = (int(min_x), int(min_y), int(cx.max()), int(cy.max()))
+        span = int(cy.max() - min_y) + 1
+        codes = (cx - min_x) * span + (cy - min_y)
+
+        # Sort by cell so each bucket is one contiguous run
+        order = np.argsort(codes, kind="stable")
+        sorted_codes = codes[order]
+        starts = np.flatnonzero(np.diff(sorted_codes)) + 1
+        starts = np.concatenate(([0], starts)).tolist()
+        ends = starts[1:] + [len(order)]
+        order = order.tolist()
+        sorted_codes = sorted_codes.tolist()
+        min_x, min_y = int(min_x), int(min_y)
+
+        cells = self.cells
+        for start, end in zip(starts, ends):
+            code = sorted_codes[start]
+            key = (code // span + min_x, code % span + min_y)
+            cells[key] = [entities[i] for i in order[start:end]]
+
+    def insert(self, entity):
+        key = self.cell_key(entity.x, entity.y)
+        self.cells.setdefault(key, []).append(entity)
+        cx, cy = key
+        if self.bounds is None:
+            self.bounds = (cx, cy, cx, cy)
+        else:
+            min_cx, min_cy, max_cx, max_cy = self.bounds
+            self.bounds = (min(min_cx, cx), min(min_cy, cy), max(max_cx, cx), max(max_cy, cy))
+
+    def remove(self, entity):
+        key = self.cell_key(entity.x, entity.y)
+        bucket = self.cells.get(key)
+        if bucket is None or entity not in bucket:
+            # Entity moved since it was bucketed, look for it everywhere
+            for key, bucket in self.cells.items():
+                if entity in bucket:
+                    break
+            else:
+                return
+        bucket.remove(entity)
+        if not bucket:
+            del self.cells[key]
+
+    def query_cells(self, min_x, min_y, max_x, max_y): # All entities in cells overlapping the box
+        size = self.cell_size
+        cells = self.cells
+        found = []
+        for cy in range(int(min_y // size), int(max_y // size) + 1):
+            for cx in range(int(min_x // size), int(max_x // size) + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found.extend(bucket)
+        return found
+
+    def query_rect(self, rect, margin=None):
+        # Entities whose rect overlaps the given rect. Entities are bucketed by center,
+        # so the search box is grown by margin (defaults to one cell) to catch sprites
+        # whose center sits in a neighbouring cell.
+        if margin is None:
+            margin = self.cell_size
+        candidates = self.query_cells(rect.left - margin, rect.top - margin,
+                                      rect.right + margin, rect.bottom + margin)
+        return [entity for entity in candidates if rect.colliderect(entity.rect)]
+
+    def query_radius(self, x, y, radius): # Entities whose center is within radius of (x, y)
+        radius_sq = radius * radius
+        candidates = self.query_cells(x - radius, y - radius, x + radius, y + radius)
+        return [entity for entity in candidates
+                if (entity.x - x) ** 2 + (entity.y - y) ** 2 <= radius_sq]
+
+    def nearest(self, x, y, k=1, max_dist=None, exclude=None):
+        # k nearest entities to (x, y), closest first. Searches outward ring by ring and
+        # stops once the next ring cannot contain anything closer than the current k-th hit.
+        if not self.cells:
+            return []
+        size = self.cell_size
+        cells = self.cells
+        center_x, center_y = int(x // size), int(y // size)
+        max_dist_sq = math.inf if max_dist is None else max_dist * max_dist
+
+        # Never search further than the occupied area (or the requested range)
+        min_cx, min_cy, max_cx, max_cy = self.bounds
+        max_ring = max(center_x - min_cx, max_cx - center_x, center_y - min_cy, max_cy - center_y, 0)
+        if max_dist is not None:
+            max_ring = min(max_ring, int(max_dist // size) + 1)
+
+        found = []  # (dist_sq, entity)
+        for ring in range(max_ring + 1):
+            if ring == 0:
+                ring_keys = [(center_x, center_y)]
+            else:
+                ring_keys = []
+                for cx in range(center_x - ring, center_x + ring + 1):
+                    ring_keys.append((cx, center_y - ring))
+                    ring_keys.append((cx, center_y + ring))
+                for cy in range(center_y - ring + 1, center_y + ring):
+                    ring_keys.append((center_x - ring, cy))
+                    ring_keys.append((center_x + ring, cy))
+
+            for key in ring_keys:
+                bucket = cells.get(key)
+                if not bucket:
+                    continue
+                for entity in bucket:
+                    if exclude is not None and entity in exclude:
+                        continue
+                    dist_sq = (entity.x - x) ** 2 + (entity.y - y) ** 2
+                    if dist_sq < max_dist_sq:
+                        found.append((dist_sq, entity))
+
+            if len(found) >= k:
+                # Anything in the next ring is at least ring * size away
+                found.sort(key=lambda item: item[0])
+                reach = ring * size
+                if found[k - 1][0] <= reach * reach:
+                    break
+
+        found.sort(key=lambda item: item[0])
+        return [entity for _, entity in found[:k]]
@@ -0,0 +1,24 @@
+# text_cache.py
+from collections import OrderedDict
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, string, color). Strings that do not change
+    # are rendered once; least recently used entries are dropped when the cache is full.
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = font.render(text, antialias, color)
+            self.surfaces[key] = surface
+            if len(self.surfaces) > self.max_entries:
+                self.surfaces.popitem(last=False)  # Evict the least recently used
+        else:
+            self.surfaces.move_to_end(key)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()